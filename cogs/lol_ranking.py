@@ -1,11 +1,21 @@
 import discord
 from discord.ext import commands, tasks
-import requests
+from discord import ui, app_commands
 import asyncio
 import os
 from datetime import datetime, time
 import json
-from collections import deque
+import heapq
+import math
+import hashlib
+
+from utils.riot_api import RiotKeyPool, PLATFORM_HOST, DEFAULT_APP_RATE_LIMIT
+from utils.ranking_collector import RankingCollector, APEX_LEAGUE_ENDPOINTS
+from utils.ranking_worker import RankingWorker, WorkerUnavailable
+from utils.ranking_store import RankingStore
+from utils.leaderboard import LeaderboardIndex
+from utils.ranking_stats import RankColumns
+from utils.nickname import parse_nickname, riot_id_key
 
 # 서버 소유자 전용 데코레이터
 def owner_only():
@@ -13,35 +23,88 @@ def owner_only():
         return ctx.author.id == ctx.guild.owner_id
     return commands.check(predicate)
 
-class RateLimiter:
-    def __init__(self, max_requests=20, time_window=1):
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = deque()
-    
-    async def wait_if_needed(self):
-        """필요시 대기하여 Rate Limit 준수"""
-        now = asyncio.get_event_loop().time()
-        
-        while self.requests and self.requests[0] <= now - self.time_window:
-            self.requests.popleft()
-        
-        if len(self.requests) >= self.max_requests:
-            sleep_time = self.requests[0] + self.time_window - now + 0.1
-            if sleep_time > 0:
-                print(f"Rate limit 대기: {sleep_time:.1f}초")
-                await asyncio.sleep(sleep_time)
-                return await self.wait_if_needed()
+# 순위표 한 페이지에 표시할 인원
+RANKING_PAGE_SIZE = 20
+
+
+# --- 순위표 페이지 이동 View (개인용, 에페메럴 메시지) ---
+class RankingPageView(ui.View):
+    def __init__(self, cog, queue_type: str, page: int):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.queue_type = queue_type
+        self.page = page
+
+    async def show_page(self, interaction: discord.Interaction, page: int):
+        embed, self.page, _ = self.cog.get_ranking_page(self.queue_type, page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @ui.button(label="◀ 이전", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: ui.Button):
+        await self.show_page(interaction, self.page - 1)
+
+    @ui.button(label="다음 ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        await self.show_page(interaction, self.page + 1)
+
+    @ui.button(label="🔎 내 순위", style=discord.ButtonStyle.primary)
+    async def my_page(self, interaction: discord.Interaction, button: ui.Button):
+        rank = self.cog.leaderboards[self.queue_type].rank_of(interaction.user.id)
+        if rank is None:
+            await interaction.response.send_message("❗ 순위표에 등록된 랭크 정보가 없습니다.", ephemeral=True)
+            return
+        await self.show_page(interaction, (rank - 1) // RANKING_PAGE_SIZE)
+
+
+# --- 순위표 채널 메시지 View (재시작 후에도 동작하는 영구 View) ---
+class RankingBoardView(ui.View):
+    def __init__(self, cog, queue_type: str):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.queue_type = queue_type
         
-        self.requests.append(now)
+        # 큐 타입마다 custom_id가 달라야 하므로 버튼을 직접 구성
+        for label, action, style in (
+            ("◀ 이전", 'prev', discord.ButtonStyle.secondary),
+            ("다음 ▶", 'next', discord.ButtonStyle.secondary),
+            ("🔎 내 순위", 'me', discord.ButtonStyle.primary),
+        ):
+            button = ui.Button(label=label, style=style, custom_id=f"lol_ranking_{queue_type}_{action}")
+            button.callback = self.make_callback(action)
+            self.add_item(button)
+
+    def make_callback(self, action: str):
+        async def callback(interaction: discord.Interaction):
+            # 채널 메시지는 항상 1페이지, 이동한 페이지는 본인에게만 보여준다
+            if action == 'me':
+                rank = self.cog.leaderboards[self.queue_type].rank_of(interaction.user.id)
+                if rank is None:
+                    await interaction.response.send_message("❗ 순위표에 등록된 랭크 정보가 없습니다.", ephemeral=True)
+                    return
+                page = (rank - 1) // RANKING_PAGE_SIZE
+                content = f"📍 현재 **{rank}위**입니다."
+            else:
+                page = 1 if action == 'next' else -1
+                content = None
+            
+            embed, page, _ = self.cog.get_ranking_page(self.queue_type, page)
+            view = RankingPageView(self.cog, self.queue_type, page)
+            await interaction.response.send_message(content=content, embed=embed, view=view, ephemeral=True)
+        return callback
+
 
 class LOLRanking(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.riot_api_key = os.getenv('RIOT_API_KEY')
-        self.base_url = "https://kr.api.riotgames.com"
+        # RIOT_API_KEYS(쉼표 구분)가 있으면 여러 키를, 없으면 RIOT_API_KEY 하나를 사용
+        api_keys = os.getenv('RIOT_API_KEYS') or os.getenv('RIOT_API_KEY', '')
+        self.riot_api_keys = [key.strip() for key in api_keys.split(',') if key.strip()]
+        self.app_rate_limit = os.getenv('RIOT_APP_RATE_LIMIT', DEFAULT_APP_RATE_LIMIT)
         
-        self.rate_limiter = RateLimiter(max_requests=18, time_window=1)
+        # 키마다 헤더 기반 Rate Limiter와 keep-alive 커넥션 풀을 가진 클라이언트 풀
+        self.key_pool = RiotKeyPool(self.riot_api_keys, self.app_rate_limit, timeout=10)
+        # Riot ID → PUUID / 소환사 ID 영구 캐시
+        self.ranking_store = RankingStore()
         
         self.solo_rank_channel_id = int(os.getenv('SOLO_RANK_CHANNEL_ID', '0'))
         self.flex_rank_channel_id = int(os.getenv('FLEX_RANK_CHANNEL_ID', '0'))
@@ -52,143 +115,159 @@ class LOLRanking(commands.Cog):
             'GOLD': 3, 'SILVER': 2, 'BRONZE': 1, 'IRON': 0
         }
         
-        self.cached_ranking_data = []
-        self.max_users_per_update = 100
+        # 멤버 ID → 랭크 데이터 (가장 최근에 갱신된 값)
+        self.ranking_cache = {}
+        self.ranking_snapshot_version = None
+        # 큐 타입별 정렬 상태를 유지하는 리더보드 (점수는 갱신 시 한 번만 계산)
+        self.leaderboards = {'solo': LeaderboardIndex(), 'flex': LeaderboardIndex()}
+        # 큐 타입별 통계용 열 데이터 (티어 분포, 백분위, 티어별 평균)
+        self.rank_columns = {'solo': RankColumns(), 'flex': RankColumns()}
+        # 데이터가 바뀔 때마다 올라가는 버전 (페이지 캐시 무효화용)
+        self.ranking_version = 0
+        self.ranking_updated_at = None
+        self.page_cache = {}
+        # 동시에 파이프라인에 올라가 있는 최대 멤버 수
+        self.max_concurrent_members = int(os.getenv('RANKING_CONCURRENCY', '8'))
+        self.collector = RankingCollector(self.key_pool, self.ranking_store, self.max_concurrent_members)
+        # RANKING_WORKER_PROCESS=1이면 파이프라인 수집을 별도 프로세스에서 실행
+        self.ranking_worker = None
+        if os.getenv('RANKING_WORKER_PROCESS', '0') == '1':
+            self.ranking_worker = RankingWorker(
+                self.riot_api_keys, self.app_rate_limit, self.max_concurrent_members, self.ranking_store.path
+            )
+        
+        # 상시 갱신 스케줄러: (마지막 갱신 시각, 멤버 ID) 최소 힙
+        self.refresh_queue = []
+        self.last_refreshed = {}
+        self.refresh_interval = int(os.getenv('RANKING_REFRESH_INTERVAL', '60'))
+        # 상시 갱신에 사용할 Rate Limit 예산 비율 (나머지는 수동 조회 등에 남겨둔다)
+        self.refresh_budget_share = float(os.getenv('RANKING_BUDGET_SHARE', '0.5'))
+        self.rolling_collection.change_interval(seconds=self.refresh_interval)
+        
+        # 전체 수집 작업 (한 번에 하나만 실행, 배치마다 체크포인트 저장)
+        self.collection_task = None
+        self.collection_progress = (0, 0)
+        # 상시 갱신 한 주기와 전체 수집이 같은 키 예산/캐시를 동시에 쓰지 않도록 공유하는 Lock
+        self.collection_lock = asyncio.Lock()
+        self.checkpoint_batch_size = int(os.getenv('RANKING_CHECKPOINT_BATCH', '25'))
+        self.checkpoint_max_age = int(os.getenv('RANKING_CHECKPOINT_MAX_AGE', str(24 * 3600)))
+        self.progress_edit_interval = float(os.getenv('RANKING_PROGRESS_INTERVAL', '5'))
+        
+        # 대량 리그 조회: 같은 최상위 리그에 이 인원 이상 있을 때만 사용
+        self.bulk_min_players = int(os.getenv('RANKING_BULK_MIN_PLAYERS', '2'))
+        self.bulk_refresh_interval = int(os.getenv('RANKING_BULK_INTERVAL', '1800'))
+        self.last_bulk_refresh = 0
+        
+        # /내랭크: 이 시간(초) 안에 갱신된 데이터는 API 호출 없이 바로 응답
+        self.rank_lookup_ttl = int(os.getenv('RANK_LOOKUP_TTL', '600'))
+        # Riot ID 키 → 진행 중인 조회 Task (같은 계정 동시 조회는 하나로 합친다)
+        self.rank_lookups = {}
+        
+        # 닉네임 변경 후 이 시간(초) 동안 추가 변경이 없으면 해당 멤버만 갱신
+        self.nickname_refresh_delay = float(os.getenv('RANKING_NICKNAME_DEBOUNCE', '5'))
+        self.pending_nickname_refreshes = {}
+        
+        # 랭크 기록: 스냅샷 저장 시 한꺼번에 기록하고, 이 일수보다 오래된 기록은 하루 1개로 줄인다
+        self.pending_history = []
+        self.history_raw_days = int(os.getenv('RANK_HISTORY_RAW_DAYS', '14'))
+
+    async def cog_load(self):
+        """수집 워커를 띄우고, 마지막 스냅샷을 불러와 재시작 후에도 API 호출 없이 발행할 수 있게 한다"""
+        if self.ranking_worker:
+            self.ranking_worker.start()
+        
+        try:
+            snapshot = await asyncio.to_thread(self.ranking_store.load_latest_snapshot)
+        except Exception as e:
+            print(f"랭킹 스냅샷 로드 실패: {e}")
+            return
+        if snapshot and not self.ranking_cache:
+            version, created_at, ranking_data = snapshot
+            for rank_data in ranking_data:
+                self.set_ranking_entry(rank_data)
+            self.ranking_snapshot_version = version
+            saved_at = datetime.fromtimestamp(created_at).strftime('%Y-%m-%d %H:%M')
+            print(f"랭킹 스냅샷 v{version} 로드 완료: {len(ranking_data)}명 ({saved_at} 수집)")
 
-    def cog_unload(self):
-        """Cog 언로드 시 태스크 정리"""
-        if hasattr(self, 'data_collection'):
-            self.data_collection.cancel()
+    async def cog_unload(self):
+        """Cog 언로드 시 태스크 및 커넥션 풀 정리"""
+        if hasattr(self, 'rolling_collection'):
+            self.rolling_collection.cancel()
         if hasattr(self, 'ranking_update'):
             self.ranking_update.cancel()
+        for task in self.pending_nickname_refreshes.values():
+            task.cancel()
+        if self.collection_running:
+            self.collection_task.cancel()
+            await asyncio.gather(self.collection_task, return_exceptions=True)
+        if self.ranking_worker:
+            await self.ranking_worker.stop()
+        await self.key_pool.close()
+        self.ranking_store.close()
 
     @staticmethod
     def extract_lol_nickname(display_name: str) -> tuple:
         """닉네임에서 롤 닉네임과 태그 추출"""
-        try:
-            parts = display_name.split('/')
-            if len(parts) >= 3:
-                lol_full = parts[2].strip()
-                
-                if '#' in lol_full:
-                    name_parts = lol_full.split('#')
-                    if len(name_parts) == 2:
-                        lol_name = name_parts[0].strip()
-                        tag = name_parts[1].strip().upper()
-                        
-                        if lol_name and tag:
-                            return (lol_name, tag)
-                
-            return (None, None)
-        except:
-            return (None, None)
+        parts = parse_nickname(display_name)
+        return (parts.lol_name, parts.tag)
 
-    async def make_api_request(self, url: str, headers: dict) -> dict:
-        """Rate Limit을 준수하는 API 요청"""
-        await self.rate_limiter.wait_if_needed()
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', 1))
-                print(f"Rate limit 도달, {retry_after}초 대기")
-                await asyncio.sleep(retry_after)
-                return await self.make_api_request(url, headers)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"API 오류: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            print(f"요청 오류: {e}")
-            return None
+    def get_riot_id(self, member: discord.Member) -> tuple:
+        """멤버의 (롤 닉네임, 태그) - 공용 레지스트리가 있으면 다시 파싱하지 않는다"""
+        registry = self.bot.get_cog('MemberRegistry')
+        if registry:
+            parts = registry.get(member)
+            return (parts.lol_name, parts.tag)
+        return self.extract_lol_nickname(member.display_name)
 
-    async def get_riot_puuid(self, game_name: str, tag_line: str) -> str:
-        """Rate Limited PUUID 조회"""
-        if not self.riot_api_key:
-            return None
-            
-        url = f"https://asia.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        headers = {"X-Riot-Token": self.riot_api_key}
-        
-        result = await self.make_api_request(url, headers)
-        return result.get('puuid') if result else None
-
-    async def get_summoner_by_puuid(self, puuid: str) -> dict:
-        """Rate Limited 소환사 정보 조회"""
-        if not puuid:
+    async def get_user_rank_data(self, member: discord.Member) -> dict:
+        """멤버의 랭크 데이터 가져오기"""
+        lol_name, tag = self.get_riot_id(member)
+        if not lol_name or not tag:
             return None
             
-        url = f"{self.base_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        headers = {"X-Riot-Token": self.riot_api_key}
-        
-        return await self.make_api_request(url, headers)
+        return await self.collector.fetch_rank_data(member.id, member.display_name, lol_name, tag)
 
-    async def get_rank_info(self, summoner_id: str) -> dict:
-        """Rate Limited 랭크 정보 조회"""
-        if not summoner_id:
-            return {}
-            
-        url = f"{self.base_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
-        headers = {"X-Riot-Token": self.riot_api_key}
-        
-        result = await self.make_api_request(url, headers)
-        if not result:
-            return {}
-            
-        ranks = {}
-        for entry in result:
-            queue_type = entry.get('queueType')
-            if queue_type == 'RANKED_SOLO_5x5':
-                ranks['solo'] = {
-                    'tier': entry.get('tier', 'UNRANKED'),
-                    'rank': entry.get('rank', ''),
-                    'lp': entry.get('leaguePoints', 0),
-                    'wins': entry.get('wins', 0),
-                    'losses': entry.get('losses', 0)
-                }
-            elif queue_type == 'RANKED_FLEX_SR':
-                ranks['flex'] = {
-                    'tier': entry.get('tier', 'UNRANKED'),
-                    'rank': entry.get('rank', ''),
-                    'lp': entry.get('leaguePoints', 0),
-                    'wins': entry.get('wins', 0),
-                    'losses': entry.get('losses', 0)
-                }
-        return ranks
+    @staticmethod
+    def is_same_riot_id(rank_data: dict, lol_name: str, tag: str) -> bool:
+        """캐시된 랭크 데이터가 같은 Riot ID의 것인지 (정규화된 키로 비교)"""
+        if not lol_name or not tag:
+            return False
+        return riot_id_key(rank_data['lol_name'], rank_data['tag']) == riot_id_key(lol_name, tag)
 
-    async def get_user_rank_data(self, member: discord.Member) -> dict:
-        """멤버의 랭크 데이터 가져오기"""
-        lol_name, tag = self.extract_lol_nickname(member.display_name)
+    async def lookup_member_rank(self, member: discord.Member) -> dict:
+        """멤버 한 명의 최신 랭크 데이터 (캐시가 신선하면 캐시, 아니면 조회)"""
+        lol_name, tag = self.get_riot_id(member)
         if not lol_name or not tag:
             return None
-            
-        print(f"처리 중: {member.display_name} ({lol_name}#{tag})")
         
-        puuid = await self.get_riot_puuid(lol_name, tag)
-        if not puuid:
-            print(f"  PUUID 조회 실패: {lol_name}#{tag}")
-            return None
+        cached = self.ranking_cache.get(member.id)
+        if (cached and self.is_same_riot_id(cached, lol_name, tag)
+                and datetime.now().timestamp() - cached.get('updated_at', 0) < self.rank_lookup_ttl):
+            return cached
+        
+        key = riot_id_key(lol_name, tag)
+        task = self.rank_lookups.get(key)
+        if task is None:
+            task = asyncio.create_task(self.get_user_rank_data(member))
+            self.rank_lookups[key] = task
             
-        summoner = await self.get_summoner_by_puuid(puuid)
-        if not summoner:
-            print(f"  소환사 정보 조회 실패: {lol_name}#{tag}")
+            def forget(done_task, key=key):
+                if self.rank_lookups.get(key) is done_task:
+                    del self.rank_lookups[key]
+            task.add_done_callback(forget)
+        
+        # 한 요청자가 취소되어도 다른 대기자의 조회는 계속되도록 보호
+        rank_data = await asyncio.shield(task)
+        if not rank_data:
             return None
-            
-        ranks = await self.get_rank_info(summoner['id'])
-        
-        print(f"  완료: {lol_name}#{tag}")
-        return {
-            'discord_name': member.display_name,
-            'lol_name': lol_name,
-            'tag': tag,
-            'summoner_name': summoner.get('name', lol_name),
-            'level': summoner.get('summonerLevel', 0),
-            'ranks': ranks
-        }
+        
+        if rank_data['member_id'] != member.id:
+            # 같은 Riot ID를 쓰는 다른 멤버의 조회 결과를 공유받은 경우
+            rank_data = {**rank_data, 'member_id': member.id, 'discord_name': member.display_name}
+        self.set_ranking_entry(rank_data)
+        if member.id in self.last_refreshed:
+            self.mark_refreshed(member.id, rank_data['updated_at'])
+        return rank_data
 
     def calculate_rank_score(self, rank_data: dict) -> int:
         """랭크 점수 계산"""
@@ -208,19 +287,31 @@ class LOLRanking(commands.Cog):
         
         return tier_score + rank_score + lp
 
-    def create_ranking_embed(self, ranking_data: list, queue_type: str) -> discord.Embed:
-        """순위표 임베드 생성"""
+    def calculate_ladder_lp(self, rank_data: dict) -> int:
+        """아이언 IV 0LP부터 누적한 LP (단계 100LP, 마스터 이상은 LP가 이어진다)"""
+        tier = rank_data.get('tier', 'UNRANKED')
+        lp = rank_data.get('lp', 0)
+        if tier not in self.tier_priority:
+            return 0
+        
+        master = self.tier_priority['MASTER']
+        if self.tier_priority[tier] >= master:
+            return master * 400 + lp
+        rank_values = {'I': 3, 'II': 2, 'III': 1, 'IV': 0}
+        return self.tier_priority[tier] * 400 + rank_values.get(rank_data.get('rank', ''), 0) * 100 + lp
+
+    def create_ranking_embed(self, ranking_data: list, queue_type: str, start_rank: int = 1,
+                             page: int = 0, total_pages: int = 1) -> discord.Embed:
+        """순위표 임베드 생성 (ranking_data는 해당 페이지의 플레이어 목록)"""
         title = f"🏆 리그오브레전드 {'솔로랭크' if queue_type == 'solo' else '자유랭크'} 순위"
         embed = discord.Embed(title=title, color=discord.Color.gold())
         
         if not ranking_data:
             embed.description = "랭크 데이터가 없습니다."
             return embed
-            
-        top_players = ranking_data[:20]
-        ranking_text = ""
         
-        for i, player in enumerate(top_players, 1):
+        lines = []
+        for i, player in enumerate(ranking_data, start_rank):
             rank_info = player['ranks'].get(queue_type, {})
             
             if rank_info.get('tier') == 'UNRANKED':
@@ -238,120 +329,761 @@ class LOLRanking(commands.Cog):
             
             rank_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
             
-            ranking_text += f"{rank_emoji} **{player['summoner_name']}**\n"
-            ranking_text += f"    {tier_text} | {wins}승 {losses}패 ({winrate}%)\n\n"
+            lines.append(f"{rank_emoji} **{player['summoner_name']}**")
+            lines.append(f"    {tier_text} | {wins}승 {losses}패 ({winrate}%)\n")
         
-        embed.description = ranking_text
-        embed.set_footer(text=f"마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+        embed.description = "\n".join(lines)
+        if page == 0:
+            embed.add_field(name="📊 티어 분포", value=self.format_tier_distribution(queue_type), inline=False)
+        updated_at = self.ranking_updated_at or datetime.now()
+        embed.set_footer(text=f"페이지 {page + 1}/{total_pages} · 마지막 업데이트: {updated_at.strftime('%Y-%m-%d %H:%M')}")
         
         return embed
 
-    async def collect_ranking_data(self):
-        """랭킹 데이터 수집"""
+    def format_tier_distribution(self, queue_type: str, details: bool = False) -> str:
+        """티어별 인원 막대그래프 (details면 평균 LP와 승률도 표시)"""
+        columns = self.rank_columns[queue_type]
+        if not len(columns):
+            return "데이터 없음"
+        
+        summary = columns.tier_summary()
+        largest = max(stats['count'] for stats in summary.values())
+        lines = []
+        for tier, priority in self.tier_priority.items():
+            stats = summary.get(priority)
+            if not stats:
+                continue
+            bar = "█" * max(1, round(stats['count'] / largest * 10))
+            line = f"`{tier:<11}` {bar} {stats['count']}명 ({stats['count'] / len(columns) * 100:.0f}%)"
+            if details:
+                line += f" · 평균 {stats['avg_lp']:.0f}LP · 승률 {stats['winrate']:.1f}%"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def format_percentile_cutoffs(self, queue_type: str) -> str:
+        """상위 10/25/50% 경계에 있는 플레이어의 랭크"""
+        leaderboard = self.leaderboards[queue_type]
+        lines = []
+        for percent in (10, 25, 50):
+            position = max(1, -(-len(leaderboard) * percent // 100))
+            member_ids = leaderboard.slice(position - 1, 1)
+            if not member_ids:
+                continue
+            rank_info = self.ranking_cache[member_ids[0]]['ranks'][queue_type]
+            lines.append(f"상위 {percent}%: {rank_info.get('tier')} {rank_info.get('rank', '')} {rank_info.get('lp', 0)}LP")
+        return "\n".join(lines) or "데이터 없음"
+
+    def get_ranking_page(self, queue_type: str, page: int) -> tuple:
+        """페이지 임베드를 (임베드, 실제 페이지, 전체 페이지 수)로 반환
+        
+        페이지는 처음 요청될 때 렌더링되고 랭킹 데이터가 바뀔 때까지 재사용된다.
+        범위를 벗어난 페이지 번호는 처음/끝으로 순환한다.
+        """
+        leaderboard = self.leaderboards[queue_type]
+        total_pages = max(1, -(-len(leaderboard) // RANKING_PAGE_SIZE))
+        page %= total_pages
+        
+        key = (queue_type, page)
+        cached = self.page_cache.get(key)
+        if cached and cached[0] == self.ranking_version:
+            return cached[1], page, total_pages
+        
+        start = page * RANKING_PAGE_SIZE
+        players = [self.ranking_cache[member_id] for member_id in leaderboard.slice(start, RANKING_PAGE_SIZE)]
+        embed = self.create_ranking_embed(players, queue_type, start + 1, page, total_pages)
+        self.page_cache[key] = (self.ranking_version, embed)
+        return embed, page, total_pages
+
+    def get_ranking_guild(self):
+        """랭킹 대상 길드 반환"""
         from main_bot import ALLOWED_GUILDS
+        return self.bot.get_guild(ALLOWED_GUILDS[0]) if ALLOWED_GUILDS else None
+
+    def get_eligible_members(self, guild) -> list:
+        """롤 닉네임이 있는 멤버만 필터링"""
+        registry = self.bot.get_cog('MemberRegistry')
+        if registry:
+            members = (guild.get_member(member_id) for member_id in registry.linked_members(guild))
+            return [member for member in members if member]
+        return [
+            member for member in guild.members
+            if not member.bot and self.get_riot_id(member)[0]
+        ]
+
+    def set_ranking_entry(self, rank_data: dict):
+        """플레이어 한 명의 랭크 데이터를 캐시와 리더보드에 반영"""
+        member_id = rank_data['member_id']
+        self.ranking_cache[member_id] = rank_data
+        self.mark_ranking_changed()
+        for queue_type, leaderboard in self.leaderboards.items():
+            queue_rank = rank_data['ranks'].get(queue_type)
+            columns = self.rank_columns[queue_type]
+            if queue_rank:
+                score = self.calculate_rank_score(queue_rank)
+                leaderboard.upsert(member_id, score)
+                self.pending_history.append((
+                    member_id, queue_type, rank_data.get('updated_at', 0),
+                    self.calculate_ladder_lp(queue_rank), queue_rank.get('wins', 0), queue_rank.get('losses', 0)
+                ))
+            else:
+                leaderboard.remove(member_id)
+            
+            if queue_rank and queue_rank.get('tier') in self.tier_priority:
+                columns.upsert(member_id, self.tier_priority[queue_rank['tier']], score,
+                               queue_rank.get('lp', 0), queue_rank.get('wins', 0), queue_rank.get('losses', 0))
+            else:
+                columns.remove(member_id)
+
+    def remove_ranking_entry(self, member_id: int):
+        """플레이어를 캐시와 리더보드에서 제거"""
+        if self.ranking_cache.pop(member_id, None) is not None:
+            self.mark_ranking_changed()
+        for leaderboard in self.leaderboards.values():
+            leaderboard.remove(member_id)
+        for columns in self.rank_columns.values():
+            columns.remove(member_id)
+
+    def mark_ranking_changed(self):
+        """랭킹 데이터 변경 기록 (렌더링된 페이지 캐시는 다음 조회 때 다시 만든다)"""
+        self.ranking_version += 1
+        self.ranking_updated_at = datetime.now()
+
+    def apply_ranking_results(self, results: list):
+        """수집 결과를 랭킹 캐시에 반영"""
+        for rank_data in results:
+            self.set_ranking_entry(rank_data)
+
+    async def save_ranking_snapshot(self):
+        """현재 랭킹 캐시를 스냅샷으로 저장"""
+        try:
+            self.ranking_snapshot_version = await asyncio.to_thread(
+                self.ranking_store.save_snapshot, list(self.ranking_cache.values())
+            )
+        except Exception as e:
+            print(f"랭킹 스냅샷 저장 실패: {e}")
+        await self.flush_rank_history()
+
+    async def flush_rank_history(self):
+        """쌓인 랭크 변화를 기록 저장소에 추가 (값이 그대로인 갱신은 저장소에서 걸러진다)"""
+        points, self.pending_history = self.pending_history, []
+        if not points:
+            return
+        try:
+            await asyncio.to_thread(self.ranking_store.append_history, points)
+        except Exception as e:
+            print(f"랭크 기록 저장 실패: {e}")
+
+    async def get_ranking_changes(self, queue_type: str, days: int) -> list:
+        """최근 days일 동안의 LP 변화를 (멤버 ID, LP 변화, 승 변화, 패 변화) 목록으로 (변화량 내림차순)"""
+        since = datetime.now().timestamp() - days * 86400
+        member_ids = self.leaderboards[queue_type].top()
+        deltas = await asyncio.to_thread(self.ranking_store.get_history_deltas, queue_type, member_ids, since)
+        changes = [(member_id, *delta) for member_id, delta in deltas.items()]
+        changes.sort(key=lambda change: change[1], reverse=True)
+        return changes
+
+    # ----------------- 대량 리그 조회 -----------------
+    async def refresh_high_tier_players(self, members: list) -> tuple:
+        """상위 티어 멤버들을 리그 단위 응답으로 한꺼번에 갱신
+        
+        이전 랭크 기준으로 같은 최상위 리그(마스터 이상)에 있는 멤버가 충분히 많으면
+        리그 전체 응답(요청 1회)에서 PUUID / 소환사 ID로 찾아 갱신한다. 일반 티어 목록은
+        플랫폼 전체라 페이지가 수백 개이므로 사용하지 않는다.
+
+        개별 조회는 한 번에 모든 큐를 가져오므로, 대량 응답이 개별 조회를 대신할 수 있는
+        멤버(랭크가 있는 모든 큐가 최상위 리그)만 대상으로 삼는다. 응답의 ID는 요청한 키
+        기준으로 암호화되므로 계정을 조회한 키별로 묶어 요청한다. 모든 큐가 확인된 멤버만
+        갱신 결과에 포함되며, 나머지는 개별 조회로 넘긴다.
+        (갱신된 랭크 데이터 목록, 사용한 API 호출 수)를 반환한다.
+        """
+        riot_keys = {}
+        for member in members:
+            previous = self.ranking_cache.get(member.id)
+            if not previous or not previous['ranks']:
+                continue
+            lol_name, tag = self.get_riot_id(member)
+            if self.is_same_riot_id(previous, lol_name, tag):
+                riot_keys[member.id] = riot_id_key(lol_name, tag)
+        accounts = await asyncio.to_thread(self.ranking_store.get_accounts, set(riot_keys.values()))
+        
+        candidates = {}
+        sources = {}
+        for member in members:
+            if member.id not in riot_keys:
+                continue
+            previous = self.ranking_cache[member.id]
+            account = accounts.get(riot_keys[member.id])
+            if not account or account['key_id'] not in self.key_pool:
+                continue
+            
+            # 최상위 리그가 아닌 큐가 하나라도 있으면 어차피 개별 조회가 필요하다
+            if any(rank_info.get('tier') not in APEX_LEAGUE_ENDPOINTS for rank_info in previous['ranks'].values()):
+                continue
+            
+            candidates[member.id] = (member, previous, account)
+            for queue_type, rank_info in previous['ranks'].items():
+                sources.setdefault((queue_type, rank_info['tier'], account['key_id']), []).append(member.id)
+        
+        found = {}
+        calls = 0
+        for (queue_type, tier, key_id), member_ids in sources.items():
+            if len(member_ids) < self.bulk_min_players:
+                continue
+            
+            targets = {}
+            for member_id in member_ids:
+                _, _, account = candidates[member_id]
+                targets[account['puuid']] = member_id
+                if account['summoner_id']:
+                    targets[account['summoner_id']] = member_id
+            
+            try:
+                calls += 1
+                for entry in await self.collector.get_apex_league(queue_type, tier, key_id):
+                    member_id = targets.get(entry.get('puuid')) or targets.get(entry.get('summonerId'))
+                    if member_id is not None:
+                        found.setdefault(member_id, {})[queue_type] = self.collector.parse_league_entry(entry, tier)
+            except Exception as e:
+                print(f"대량 리그 조회 오류 ({queue_type} {tier}): {e}")
+        
+        now = datetime.now().timestamp()
+        results = []
+        for member_id, ranks in found.items():
+            member, previous, _ = candidates[member_id]
+            if set(ranks) != set(previous['ranks']):
+                continue
+            results.append(dict(previous, discord_name=member.display_name, ranks=ranks, updated_at=now))
         
-        guild = self.bot.get_guild(ALLOWED_GUILDS[0]) if ALLOWED_GUILDS else None
+        if calls:
+            print(f"대량 리그 조회: {calls}회 호출로 {len(results)}명 갱신")
+        return results, calls
+
+    async def collect_ranking_data(self, progress_callback=None) -> int:
+        """연동된 전체 멤버의 랭킹 데이터 수집
+        
+        멤버를 checkpoint_batch_size명씩 나눠 처리하고, 배치가 끝날 때마다 스냅샷과
+        체크포인트를 저장한다. 중단된 수집이 checkpoint_max_age 안에 다시 시작되면
+        이미 끝난 멤버는 건너뛴다. progress_callback(완료 인원, 전체 인원)은 배치마다
+        호출된다. 이번 실행에서 갱신한 인원 수를 반환한다.
+        """
+        guild = self.get_ranking_guild()
         if not guild:
             print("길드를 찾을 수 없습니다.")
-            return
+            return 0
             
-        print(f"랭킹 데이터 수집 시작... (최대 {self.max_users_per_update}명)")
+        eligible_members = self.get_eligible_members(guild)
+        self.prune_ranking_cache(guild)
         
-        # 롤 닉네임이 있는 멤버만 필터링
-        eligible_members = []
-        for member in guild.members:
-            if member.bot:
+        checkpoint = await asyncio.to_thread(self.ranking_store.load_collection_checkpoint)
+        now = datetime.now().timestamp()
+        if checkpoint and now - checkpoint[0] < self.checkpoint_max_age:
+            started_at, done = checkpoint
+            print(f"중단된 랭킹 수집 이어서 진행... (완료 {len(done)}명 / 대상 {len(eligible_members)}명)")
+        else:
+            started_at, done = now, set()
+            print(f"랭킹 데이터 수집 시작... (대상 {len(eligible_members)}명)")
+        
+        eligible_ids = {member.id for member in eligible_members}
+        remaining = [member for member in eligible_members if member.id not in done]
+        total = len(eligible_members)
+        collected = 0
+        
+        async def checkpoint_batch(members: list, results: list):
+            nonlocal collected
+            collected += len(results)
+            refreshed_at = datetime.now().timestamp()
+            for member in members:
+                self.mark_refreshed(member.id, refreshed_at)
+                done.add(member.id)
+            # 스냅샷을 먼저 저장해야 체크포인트에 기록된 멤버의 데이터가 남는다
+            await self.save_ranking_snapshot()
+            await asyncio.to_thread(self.ranking_store.save_collection_checkpoint, started_at, done)
+            if progress_callback:
+                await progress_callback(len(done & eligible_ids), total)
+        
+        if progress_callback:
+            await progress_callback(len(done & eligible_ids), total)
+        
+        # 상위 티어는 리그 단위 응답으로 먼저 갱신하고 나머지만 개별 조회
+        bulk_data, _ = await self.refresh_high_tier_players(remaining)
+        if bulk_data:
+            bulk_ids = {rank_data['member_id'] for rank_data in bulk_data}
+            self.apply_ranking_results(bulk_data)
+            await checkpoint_batch([member for member in remaining if member.id in bulk_ids], bulk_data)
+            remaining = [member for member in remaining if member.id not in bulk_ids]
+        
+        # 수집 결과는 도착하는 대로 캐시에 반영된다
+        for start in range(0, len(remaining), self.checkpoint_batch_size):
+            batch = remaining[start:start + self.checkpoint_batch_size]
+            results = await self.run_collection_pipeline(batch)
+            await checkpoint_batch(batch, results)
+        
+        await asyncio.to_thread(self.ranking_store.clear_collection_checkpoint)
+        print(f"데이터 수집 완료: {collected}명 갱신 (스냅샷 v{self.ranking_snapshot_version})")
+        return collected
+
+    @property
+    def collection_running(self) -> bool:
+        return self.collection_task is not None and not self.collection_task.done()
+
+    def start_collection_job(self, publish: bool = False, status_message: discord.Message = None) -> bool:
+        """전체 수집을 백그라운드 작업으로 시작 (이미 실행 중이면 False)"""
+        if self.collection_running:
+            return False
+        self.collection_progress = (0, 0)
+        self.collection_task = asyncio.create_task(self.run_collection_job(publish, status_message))
+        return True
+
+    async def run_collection_job(self, publish: bool, status_message: discord.Message = None):
+        """전체 수집 작업 본체: 진행 상황을 상태 메시지에 주기적으로 반영"""
+        last_edit = 0.0
+        
+        async def show(text: str):
+            if status_message:
+                try:
+                    await status_message.edit(content=text)
+                except discord.HTTPException as e:
+                    print(f"수집 상태 메시지 수정 실패: {e}")
+        
+        async def on_progress(done: int, total: int):
+            nonlocal last_edit
+            self.collection_progress = (done, total)
+            now = asyncio.get_running_loop().time()
+            if now - last_edit >= self.progress_edit_interval or done == total:
+                last_edit = now
+                await show(f"📄 랭킹 데이터 수집 중... ({done}/{total}명)")
+        
+        try:
+            if self.collection_lock.locked():
+                await show("⏳ 진행 중인 상시 갱신이 끝나면 수집을 시작합니다...")
+            async with self.collection_lock:
+                collected = await self.collect_ranking_data(progress_callback=on_progress)
+            if publish:
+                await show(f"📊 수집 완료 ({collected}명 갱신), 순위표를 발행합니다...")
+                await self.publish_rankings()
+            await show(f"✅ 랭킹 데이터 수집이 완료되었습니다! ({collected}명 갱신)"
+                       + (" 순위표 발행 완료" if publish else ""))
+        except asyncio.CancelledError:
+            done, total = self.collection_progress
+            print(f"랭킹 수집 취소됨 ({done}/{total}명)")
+            await show(f"⏹️ 랭킹 수집이 취소되었습니다. ({done}/{total}명 완료, 다음 수집 때 이어서 진행)")
+            raise
+        except Exception as e:
+            print(f"랭킹 수집 오류: {e}")
+            await show(f"❌ 랭킹 수집 중 오류가 발생했습니다: {e}")
+
+    # ----------------- 상시 갱신 스케줄러 -----------------
+    def prune_ranking_cache(self, guild):
+        """서버를 떠났거나 롤 닉네임이 바뀐 멤버의 랭킹 데이터 제거"""
+        for member_id, rank_data in list(self.ranking_cache.items()):
+            member = guild.get_member(member_id)
+            if not member:
+                self.remove_ranking_entry(member_id)
                 continue
-            if self.extract_lol_nickname(member.display_name):
-                eligible_members.append(member)
+            lol_name, tag = self.get_riot_id(member)
+            if not self.is_same_riot_id(rank_data, lol_name, tag):
+                self.remove_ranking_entry(member_id)
+                # 새 닉네임은 다음 주기에 바로 갱신
+                if lol_name:
+                    self.mark_refreshed(member_id, 0)
+
+    def mark_refreshed(self, member_id: int, timestamp: float):
+        """갱신 시각 기록 후 우선순위 큐 맨 뒤로 보낸다"""
+        self.last_refreshed[member_id] = timestamp
+        heapq.heappush(self.refresh_queue, (timestamp, member_id))
+
+    def sync_refresh_queue(self, guild):
+        """새로 연동된 멤버를 큐에 추가하고 더 이상 대상이 아닌 멤버는 제외"""
+        eligible_ids = set()
+        for member in self.get_eligible_members(guild):
+            eligible_ids.add(member.id)
+            if member.id not in self.last_refreshed:
+                cached = self.ranking_cache.get(member.id)
+                self.mark_refreshed(member.id, cached.get('updated_at', 0) if cached else 0)
+        
+        for member_id in list(self.last_refreshed):
+            if member_id not in eligible_ids:
+                del self.last_refreshed[member_id]
+        
+        # 무효 항목이 너무 많이 쌓이면 힙을 다시 만든다
+        if len(self.refresh_queue) > 2 * len(self.last_refreshed) + 64:
+            self.refresh_queue = [(ts, mid) for mid, ts in self.last_refreshed.items()]
+            heapq.heapify(self.refresh_queue)
+
+    def refresh_budget(self) -> float:
+        """이번 주기에 상시 갱신이 쓸 수 있는 플랫폼 API 호출 수"""
+        return self.key_pool.sustained_rate(PLATFORM_HOST) * self.refresh_interval * self.refresh_budget_share
+
+    async def pop_stalest_members(self, guild, budget: float) -> list:
+        """가장 오래 갱신되지 않은 멤버부터 예산이 허락하는 만큼 꺼낸다
+        
+        멤버는 최소 1회 호출이 필요하므로 예산만큼씩 꺼내 저장소 조회(조회 불가 여부,
+        캐시된 계정)를 한 번에 스레드에서 처리한다. 예산이 모자라 고르지 못한 멤버는
+        원래 순서대로 큐에 되돌린다.
+        """
+        selected = []
+        while self.refresh_queue and budget > 0:
+            batch = []
+            while self.refresh_queue and len(batch) < math.ceil(budget):
+                timestamp, member_id = heapq.heappop(self.refresh_queue)
+                if self.last_refreshed.get(member_id) != timestamp:
+                    continue   # 이미 다시 예약된 항목
+                member = guild.get_member(member_id)
+                if not member:
+                    del self.last_refreshed[member_id]
+                    continue
+                batch.append((timestamp, member, riot_id_key(*self.get_riot_id(member))))
+            if not batch:
+                break
+            
+            unresolvable, cached = await self.collector.lookup_cached(key for _, _, key in batch)
+            for index, (timestamp, member, key) in enumerate(batch):
+                if key in unresolvable:
+                    # 조회 불가 Riot ID는 예산을 쓰지 않고 다음 주기로 미룬다
+                    self.mark_refreshed(member.id, datetime.now().timestamp())
+                    continue
+                
+                # 캐시된 계정은 리그 호출 1회, 아니면 소환사 + 리그 2회
+                cost = 1 if key in cached else 2
+                if selected and cost > budget:
+                    for entry_timestamp, entry_member, _ in batch[index:]:
+                        heapq.heappush(self.refresh_queue, (entry_timestamp, entry_member.id))
+                    return selected
+                selected.append(member)
+                budget -= cost
+        return selected
+
+    async def refresh_stalest(self) -> int:
+        """상시 갱신 1주기: 가장 오래된 멤버들을 예산만큼 갱신"""
+        guild = self.get_ranking_guild()
+        if not guild or not self.key_pool:
+            return 0
+        
+        self.sync_refresh_queue(guild)
+        self.prune_ranking_cache(guild)
+        budget = self.refresh_budget()
+        
+        # 주기적으로 상위 티어 멤버 전체를 리그 단위 응답으로 갱신
+        results = []
+        now = datetime.now().timestamp()
+        if now - self.last_bulk_refresh >= self.bulk_refresh_interval:
+            self.last_bulk_refresh = now
+            results, calls = await self.refresh_high_tier_players(self.get_eligible_members(guild))
+            budget -= calls
+            self.apply_ranking_results(results)
+            for rank_data in results:
+                self.mark_refreshed(rank_data['member_id'], now)
+        
+        members = await self.pop_stalest_members(guild, budget)
+        if members:
+            try:
+                results += await self.run_collection_pipeline(members)
+            finally:
+                # 큐에서 꺼낸 멤버는 실패해도 다시 넣어야 이후 주기에서 빠지지 않는다
+                now = datetime.now().timestamp()
+                for member in members:
+                    self.mark_refreshed(member.id, now)
+        if not results:
+            return 0
+        
+        await self.save_ranking_snapshot()
+        return len(results)
+
+    async def run_collection_pipeline(self, members: list, concurrency: int = None, progress_callback=None) -> list:
+        """멤버들의 랭크 데이터를 수집하고, 결과가 나오는 대로 캐시에 반영
+        
+        워커 프로세스 모드면 워커에서, 아니면 봇 프로세스의 RankingCollector로 수집한다.
+        워커가 응답하지 않으면 이번 수집은 봇 프로세스에서 처리한다.
+        """
+        targets = []
+        for member in members:
+            lol_name, tag = self.get_riot_id(member)
+            if lol_name and tag:
+                targets.append((member.id, member.display_name, lol_name, tag))
         
-        # 제한된 수만 처리
-        members_to_process = eligible_members[:self.max_users_per_update]
-        print(f"처리 대상: {len(members_to_process)}명 (전체 {len(eligible_members)}명 중)")
+        async def apply(results: list):
+            self.apply_ranking_results(results)
+        
+        if self.ranking_worker:
+            try:
+                return await self.ranking_worker.collect(targets, progress_callback, apply)
+            except WorkerUnavailable as e:
+                print(f"랭킹 수집 워커 사용 불가, 봇 프로세스에서 수집합니다: {e}")
+        return await self.collector.run_pipeline(targets, concurrency, progress_callback, apply)
+
+    # ----------------- 닉네임 변경 감지 -----------------
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """롤 닉네임이 바뀐 멤버만 디바운스 후 개별 갱신"""
+        if after.bot or before.display_name == after.display_name:
+            return
+        if self.extract_lol_nickname(before.display_name) == self.extract_lol_nickname(after.display_name):
+            return
+        guild = self.get_ranking_guild()
+        if not guild or after.guild.id != guild.id:
+            return
+        
+        # 연속 변경 시 마지막 변경만 반영
+        pending = self.pending_nickname_refreshes.pop(after.id, None)
+        if pending:
+            pending.cancel()
+        self.pending_nickname_refreshes[after.id] = asyncio.create_task(self.refresh_after_nickname_change(after.id))
+
+    async def refresh_after_nickname_change(self, member_id: int):
+        """디바운스 대기 후 멤버 한 명의 캐시와 리더보드를 갱신"""
+        try:
+            await asyncio.sleep(self.nickname_refresh_delay)
+        except asyncio.CancelledError:
+            return
+        
+        if self.pending_nickname_refreshes.get(member_id) is asyncio.current_task():
+            del self.pending_nickname_refreshes[member_id]
+        
+        guild = self.get_ranking_guild()
+        member = guild.get_member(member_id) if guild else None
+        if not member:
+            return
         
-        all_data = []
+        lol_name, tag = self.get_riot_id(member)
+        cached = self.ranking_cache.get(member_id)
+        if cached and not self.is_same_riot_id(cached, lol_name, tag):
+            self.remove_ranking_entry(member_id)
         
-        # 순차적으로 처리 (Rate Limit 준수)
-        for i, member in enumerate(members_to_process, 1):
+        if lol_name and tag:
             try:
-                print(f"[{i}/{len(members_to_process)}] {member.display_name}")
-                rank_data = await self.get_user_rank_data(member)
-                if rank_data:
-                    all_data.append(rank_data)
-                    
+                rank_data = await self.lookup_member_rank(member)
             except Exception as e:
-                print(f"오류 발생 ({member.display_name}): {e}")
-                continue
+                print(f"닉네임 변경 갱신 오류 ({member.display_name}): {e}")
+                rank_data = None
+            print(f"닉네임 변경 갱신: {member.display_name} ({'성공' if rank_data else '실패'})")
         
-        # 데이터 캐싱
-        self.cached_ranking_data = all_data
-        print(f"데이터 수집 완료: {len(all_data)}명")
+        await self.save_ranking_snapshot()
 
     async def publish_rankings(self):
         """캐시된 데이터로 순위표 발행"""
-        if not self.cached_ranking_data:
+        if not self.ranking_cache:
             print("캐시된 랭킹 데이터가 없습니다.")
             return
         
-        # 솔로랭크 순위
-        solo_ranking = sorted([p for p in self.cached_ranking_data if 'solo' in p['ranks']], 
-                            key=lambda x: self.calculate_rank_score(x['ranks']['solo']), 
-                            reverse=True)
-        
-        # 자유랭크 순위
-        flex_ranking = sorted([p for p in self.cached_ranking_data if 'flex' in p['ranks']], 
-                            key=lambda x: self.calculate_rank_score(x['ranks']['flex']), 
-                            reverse=True)
+        # 리더보드 인덱스가 이미 정렬 상태를 유지하므로 첫 페이지만 렌더링한다
+        await self.update_ranking_channel(self.solo_rank_channel_id, 'solo')
+        await self.update_ranking_channel(self.flex_rank_channel_id, 'flex')
         
-        # 채널 업데이트
-        await self.update_ranking_channel(self.solo_rank_channel_id, solo_ranking, 'solo')
-        await self.update_ranking_channel(self.flex_rank_channel_id, flex_ranking, 'flex')
+        print(f"순위표 발행 완료: 솔로 {len(self.leaderboards['solo'])}명, 자유 {len(self.leaderboards['flex'])}명")
+
+    @staticmethod
+    def embed_content_hash(embed: discord.Embed, total_pages: int) -> str:
+        """갱신 시각(푸터)을 제외한 임베드 내용과 전체 페이지 수의 해시
         
-        print(f"순위표 발행 완료: 솔로 {len(solo_ranking)}명, 자유 {len(flex_ranking)}명")
+        푸터의 페이지 표시는 해시에서 빠지므로, 첫 페이지가 그대로여도 인원이 바뀌어
+        페이지 수가 달라지면 다시 수정하도록 페이지 수를 따로 넣는다.
+        """
+        content = embed.to_dict()
+        content.pop('footer', None)
+        content.pop('timestamp', None)
+        content['total_pages'] = total_pages
+        return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
 
-    async def update_ranking_channel(self, channel_id: int, ranking_data: list, queue_type: str):
-        """순위표 채널 업데이트"""
+    async def update_ranking_channel(self, channel_id: int, queue_type: str):
+        """순위표 채널 업데이트 (기존 메시지를 제자리에서 수정, 내용이 같으면 생략)"""
         if not channel_id:
             return
             
         channel = self.bot.get_channel(channel_id)
         if not channel:
             return
-            
-        # 기존 메시지 삭제
-        async for message in channel.history(limit=100):
-            if message.author == self.bot.user:
-                await message.delete()
-                
-        # 새 순위표 전송
-        embed = self.create_ranking_embed(ranking_data, queue_type)
-        await channel.send(embed=embed)
+        
+        embed, _, total_pages = self.get_ranking_page(queue_type, 0)
+        content_hash = self.embed_content_hash(embed, total_pages)
+        records = await asyncio.to_thread(self.ranking_store.get_leaderboard_messages, channel_id)
+        record = records.pop(queue_type, None)
+        
+        if record and record['content_hash'] == content_hash:
+            return
+        
+        message = None
+        if record:
+            try:
+                # 조회 없이 바로 수정 (REST 호출 1회)
+                message = await channel.get_partial_message(record['message_id']).edit(
+                    embed=embed, view=RankingBoardView(self, queue_type)
+                )
+            except discord.NotFound:
+                message = None
+        else:
+            # 저장된 메시지가 없을 때만 예전 방식으로 남은 봇 메시지 정리 (같은 채널의 다른 큐 순위표는 유지)
+            others = {other['message_id'] for other in records.values()}
+            async for old_message in channel.history(limit=100):
+                if old_message.author == self.bot.user and old_message.id not in others:
+                    await old_message.delete()
+        
+        if message is None:
+            message = await channel.send(embed=embed, view=RankingBoardView(self, queue_type))
+        
+        await asyncio.to_thread(
+            self.ranking_store.save_leaderboard_message, channel_id, queue_type, message.id, content_hash
+        )
 
-    @tasks.loop(time=time(hour=2, minute=30))  # 새벽 2:30 데이터 수집
-    async def data_collection(self):
-        """일일 데이터 수집"""
-        await self.collect_ranking_data()
+    @tasks.loop(seconds=60)  # 간격은 RANKING_REFRESH_INTERVAL로 조정
+    async def rolling_collection(self):
+        """상시 데이터 수집 (오래된 멤버부터 조금씩 갱신)"""
+        if self.collection_running or self.collection_lock.locked():
+            # 전체 수집 중에는 같은 멤버를 두 번 조회하지 않도록 쉰다
+            return
+        try:
+            version = self.ranking_version
+            async with self.collection_lock:
+                refreshed = await self.refresh_stalest()
+            if refreshed:
+                print(f"상시 갱신: {refreshed}명 갱신 (추적 중 {len(self.last_refreshed)}명)")
+            if self.ranking_version != version:
+                # 채널 순위표도 최신 데이터로 유지 (첫 페이지 내용이 같으면 수정하지 않는다)
+                await self.update_ranking_channel(self.solo_rank_channel_id, 'solo')
+                await self.update_ranking_channel(self.flex_rank_channel_id, 'flex')
+        except Exception as e:
+            print(f"상시 갱신 오류: {e}")
 
     @tasks.loop(time=time(hour=3, minute=0))   # 새벽 3:00 순위표 발행
     async def ranking_update(self):
-        """일일 순위표 발행"""
+        """일일 순위표 발행 및 오래된 랭크 기록 정리"""
         await self.publish_rankings()
+        
+        older_than = datetime.now().timestamp() - self.history_raw_days * 86400
+        try:
+            removed = await asyncio.to_thread(self.ranking_store.downsample_history, older_than)
+            if removed:
+                print(f"랭크 기록 정리: {removed}건 삭제")
+        except Exception as e:
+            print(f"랭크 기록 정리 실패: {e}")
 
-    @data_collection.before_loop
-    async def before_data_collection(self):
+    @rolling_collection.before_loop
+    async def before_rolling_collection(self):
         await self.bot.wait_until_ready()
+        # 재시작 등으로 중단된 전체 수집이 있으면 이어서 진행
+        checkpoint = await asyncio.to_thread(self.ranking_store.load_collection_checkpoint)
+        if checkpoint and datetime.now().timestamp() - checkpoint[0] < self.checkpoint_max_age:
+            self.start_collection_job()
 
     @ranking_update.before_loop
     async def before_ranking_update(self):
         await self.bot.wait_until_ready()
 
+    def create_member_rank_embed(self, member: discord.Member, rank_data: dict) -> discord.Embed:
+        """멤버 한 명의 솔로/자유랭크 정보 임베드"""
+        embed = discord.Embed(
+            title=f"📈 {rank_data['lol_name']}#{rank_data['tag']}",
+            color=discord.Color.gold()
+        )
+        embed.set_author(name=member.display_name, icon_url=member.display_avatar.url)
+        
+        for queue_type, queue_name in (('solo', '솔로랭크'), ('flex', '자유랭크')):
+            rank_info = rank_data['ranks'].get(queue_type)
+            if not rank_info:
+                embed.add_field(name=queue_name, value="언랭크", inline=True)
+                continue
+            
+            wins = rank_info.get('wins', 0)
+            losses = rank_info.get('losses', 0)
+            total_games = wins + losses
+            winrate = round((wins / total_games * 100), 1) if total_games > 0 else 0
+            position = self.leaderboards[queue_type].rank_of(member.id)
+            
+            value = (f"{rank_info.get('tier')} {rank_info.get('rank', '')} {rank_info.get('lp', 0)}LP\n"
+                     f"{wins}승 {losses}패 ({winrate}%)")
+            if position:
+                value += f"\n서버 {position}위 / {len(self.leaderboards[queue_type])}명"
+                percentile = self.rank_columns[queue_type].percentile(member.id)
+                if percentile is not None:
+                    value += f" (상위 {percentile:.1f}%)"
+            embed.add_field(name=queue_name, value=value, inline=True)
+        
+        updated_at = datetime.fromtimestamp(rank_data.get('updated_at', 0))
+        embed.set_footer(text=f"갱신 시각: {updated_at.strftime('%Y-%m-%d %H:%M')}")
+        return embed
+
+    @app_commands.command(name="내랭크", description="내(또는 지정한 멤버의) 솔로/자유랭크 정보를 확인합니다.")
+    @app_commands.guild_only()
+    @app_commands.rename(member="멤버")
+    @app_commands.describe(member="랭크를 확인할 멤버 (비우면 본인)")
+    async def my_rank(self, interaction: discord.Interaction, member: discord.Member = None):
+        member = member or interaction.user
+        lol_name, tag = self.get_riot_id(member)
+        if not lol_name or not tag:
+            await interaction.response.send_message(
+                "❗ 닉네임에서 롤 닉네임을 찾을 수 없습니다.\n"
+                "형식: `별명/출생년도/롤닉네임#태그`", 
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            rank_data = await self.lookup_member_rank(member)
+        except Exception as e:
+            print(f"랭크 조회 오류 ({member.display_name}): {e}")
+            rank_data = None
+        
+        if not rank_data:
+            await interaction.followup.send(f"⚠️ `{lol_name}#{tag}` 계정의 랭크 정보를 불러오지 못했습니다.", ephemeral=True)
+            return
+        await interaction.followup.send(embed=self.create_member_rank_embed(member, rank_data), ephemeral=True)
+
+    def create_ranking_changes_embed(self, queue_type: str, period: str, changes: list) -> discord.Embed:
+        """기간별 LP 상승/하락 순위 임베드"""
+        queue_name = '솔로랭크' if queue_type == 'solo' else '자유랭크'
+        embed = discord.Embed(title=f"📊 {period} {queue_name} LP 변동", color=discord.Color.gold())
+        
+        def describe(index: int, change: tuple) -> str:
+            member_id, lp_delta, wins, losses = change
+            player = self.ranking_cache.get(member_id)
+            name = player['discord_name'] if player else f"<@{member_id}>"
+            rank_info = player['ranks'].get(queue_type, {}) if player else {}
+            tier = f"{rank_info.get('tier', '')} {rank_info.get('rank', '')}".strip()
+            return f"{index}. **{name}** {lp_delta:+d}LP ({wins}승 {losses}패) · 현재 {tier}"
+        
+        climbers = [change for change in changes if change[1] > 0][:10]
+        fallers = [change for change in reversed(changes) if change[1] < 0][:5]
+        if not climbers and not fallers:
+            embed.description = "해당 기간의 랭크 변동 기록이 없습니다."
+            return embed
+        if climbers:
+            embed.add_field(name="📈 상승", value="\n".join(describe(i, c) for i, c in enumerate(climbers, 1)), inline=False)
+        if fallers:
+            embed.add_field(name="📉 하락", value="\n".join(describe(i, c) for i, c in enumerate(fallers, 1)), inline=False)
+        return embed
+
+    @app_commands.command(name="랭킹변동", description="최근 하루/일주일 동안 LP가 가장 많이 오르내린 멤버를 확인합니다.")
+    @app_commands.guild_only()
+    @app_commands.rename(period="기간", queue_type="큐")
+    @app_commands.choices(
+        period=[app_commands.Choice(name="일간", value=1), app_commands.Choice(name="주간", value=7)],
+        queue_type=[app_commands.Choice(name="솔로랭크", value="solo"), app_commands.Choice(name="자유랭크", value="flex")]
+    )
+    async def ranking_changes(self, interaction: discord.Interaction,
+                              period: app_commands.Choice[int], queue_type: app_commands.Choice[str] = None):
+        queue = queue_type.value if queue_type else 'solo'
+        changes = await self.get_ranking_changes(queue, period.value)
+        await interaction.response.send_message(embed=self.create_ranking_changes_embed(queue, period.name, changes))
+
+    @commands.command(name="랭킹통계")
+    @owner_only()
+    async def ranking_stats(self, ctx):
+        """솔로/자유랭크 티어 분포와 티어별 평균 (서버 소유자 전용)"""
+        embed = discord.Embed(title="📊 서버 랭크 통계", color=discord.Color.gold())
+        for queue_type, queue_name in (('solo', '솔로랭크'), ('flex', '자유랭크')):
+            embed.add_field(
+                name=f"{queue_name} ({len(self.rank_columns[queue_type])}명)",
+                value=self.format_tier_distribution(queue_type, details=True),
+                inline=False
+            )
+            embed.add_field(name=f"{queue_name} 백분위", value=self.format_percentile_cutoffs(queue_type), inline=False)
+        await ctx.send(embed=embed)
+
     @commands.command(name="랭킹수집")
     @owner_only()
     async def manual_collect(self, ctx):
         """수동으로 랭킹 데이터 수집 (서버 소유자 전용)"""
-        await ctx.send("📄 랭킹 데이터 수집을 시작합니다... (최대 30분 소요)")
-        await self.collect_ranking_data()
-        await ctx.send("✅ 랭킹 데이터 수집이 완료되었습니다!")
+        await self.start_collection_command(ctx, publish=False)
 
     @commands.command(name="랭킹발행")
     @owner_only()
@@ -365,14 +1097,33 @@ class LOLRanking(commands.Cog):
     @owner_only()
     async def manual_full_update(self, ctx):
         """수동으로 전체 랭킹 업데이트 (서버 소유자 전용)"""
-        await ctx.send("📄 전체 랭킹 업데이트를 시작합니다...")
-        await self.collect_ranking_data()
-        await self.publish_rankings()
-        await ctx.send("✅ 전체 랭킹 업데이트가 완료되었습니다!")
+        await self.start_collection_command(ctx, publish=True)
+
+    @commands.command(name="랭킹수집취소")
+    @owner_only()
+    async def cancel_collect(self, ctx):
+        """진행 중인 랭킹 수집 취소 (서버 소유자 전용)"""
+        if not self.collection_running:
+            await ctx.send("❗ 진행 중인 랭킹 수집이 없습니다.")
+            return
+        self.collection_task.cancel()
+        await ctx.send("⏹️ 랭킹 수집 취소를 요청했습니다.")
+
+    async def start_collection_command(self, ctx, publish: bool):
+        """수집 작업을 시작하고 진행 상황을 표시할 메시지를 남긴다"""
+        if self.collection_running:
+            done, total = self.collection_progress
+            await ctx.send(f"⏳ 이미 랭킹 수집이 진행 중입니다. ({done}/{total}명) `!랭킹수집취소`로 취소할 수 있습니다.")
+            return
+        status_message = await ctx.send("📄 랭킹 데이터 수집을 시작합니다...")
+        self.start_collection_job(publish=publish, status_message=status_message)
 
 async def setup(bot):
     cog = LOLRanking(bot)
     await bot.add_cog(cog)
+    # 재시작 후에도 순위표 버튼이 동작하도록 영구 View 등록
+    bot.add_view(RankingBoardView(cog, 'solo'))
+    bot.add_view(RankingBoardView(cog, 'flex'))
     # Cog 로드 완료 후 태스크 시작
-    cog.data_collection.start()
+    cog.rolling_collection.start()
     cog.ranking_update.start()
\ No newline at end of file
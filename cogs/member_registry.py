@@ -0,0 +1,89 @@
+import discord
+from discord.ext import commands
+from types import MappingProxyType
+
+from utils.nickname import NicknameParts, parse_nickname
+
+
+# --- 멤버 닉네임 레지스트리 Cog ---
+class MemberRegistry(commands.Cog):
+    """멤버별로 파싱된 닉네임(별명, 출생년도, Riot ID)을 보관하는 공용 레지스트리
+
+    시작 시 멤버 캐시로 한 번 만들고, 이후에는 게이트웨이 이벤트로만 갱신한다.
+    다른 Cog는 bot.get_cog('MemberRegistry')로 접근해 문자열을 다시 나누지 않는다.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._members: dict[int, dict[int, NicknameParts]] = {}   # 길드 ID → 멤버 ID → 닉네임
+        self._linked: dict[int, dict[int, NicknameParts]] = {}    # 길드 ID → Riot ID가 있는 멤버만
+
+    async def cog_load(self):
+        # Cog를 다시 불러온 경우에는 on_ready가 오지 않으므로 바로 구성
+        if self.bot.is_ready():
+            self.rebuild()
+
+    def rebuild(self):
+        """봇의 멤버 캐시 전체로 레지스트리를 다시 구성"""
+        self._members.clear()
+        self._linked.clear()
+        for guild in self.bot.guilds:
+            for member in guild.members:
+                self.update(member)
+
+    def update(self, member: discord.Member) -> NicknameParts:
+        """멤버 한 명의 닉네임을 다시 파싱해 저장"""
+        parts = parse_nickname(member.display_name)
+        self._members.setdefault(member.guild.id, {})[member.id] = parts
+        linked = self._linked.setdefault(member.guild.id, {})
+        if parts.has_riot_id and not member.bot:
+            linked[member.id] = parts
+        else:
+            linked.pop(member.id, None)
+        return parts
+
+    def remove(self, member: discord.Member):
+        self._members.get(member.guild.id, {}).pop(member.id, None)
+        self._linked.get(member.guild.id, {}).pop(member.id, None)
+
+    def get(self, member: discord.Member) -> NicknameParts:
+        """멤버의 파싱된 닉네임 (레지스트리에 없으면 파싱 후 등록)"""
+        parts = self._members.get(member.guild.id, {}).get(member.id)
+        if parts is None:
+            parts = self.update(member)
+        return parts
+
+    def linked_members(self, guild: discord.Guild) -> dict:
+        """Riot ID가 연동된 (봇이 아닌) 멤버의 {멤버 ID: 닉네임} 뷰"""
+        return MappingProxyType(self._linked.setdefault(guild.id, {}))
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.rebuild()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.display_name != after.display_name:
+            self.update(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # 서버 별명이 없는 멤버는 전역 표시 이름이 바뀌어도 on_member_update가 오지 않는다
+        if before.display_name == after.display_name:
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                self.update(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.remove(member)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MemberRegistry(bot))
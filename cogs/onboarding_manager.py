@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import ui
-import asyncio
+
+from utils.scheduler import get_scheduler
 
 # 역할 목록
 PLAY_TIME_ROLES = ["Morning", "Afternoon", "Night", "Dawn", "All-TIME"]
@@ -80,12 +81,8 @@ class PrivateRoleSelectView(ui.View):
                 welcome_embed.set_thumbnail(url=self.member.display_avatar.url)
                 await welcome_channel.send(embed=welcome_embed)
 
-            # 3초 후 스레드 삭제
-            await asyncio.sleep(3)
-            try:
-                await self.thread.delete()
-            except:
-                pass
+            # 3초 후 스레드 삭제 (기다리지 않고 예약만 한다)
+            get_scheduler(bot).delete_later(self.thread, 3)
 
         except Exception as e:
             await interaction.response.send_message(f"오류가 발생했습니다: {e}", ephemeral=True)
@@ -63,6 +63,13 @@ class MyBot(commands.Bot):
         self.free_party_text_channel_id = FREE_PARTY_TEXT_CHANNEL_ID
         self.free_party_trigger_channel_id = FREE_PARTY_TRIGGER_CHANNEL_ID
 
+    async def close(self):
+        # Cog 언로드(파티 상태 저장 등)가 끝난 뒤 공용 스케줄러의 남은 예약을 정리
+        await super().close()
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler:
+            scheduler.close()
+
     async def on_ready(self):
         logging.info(f"{self.user}으로 로그인 성공!")
         logging.info(f"봇 ID: {self.user.id}")
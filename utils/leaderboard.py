@@ -0,0 +1,56 @@
+from bisect import bisect_left, insort
+
+
+class LeaderboardIndex:
+    """점수 내림차순으로 항상 정렬된 상태를 유지하는 리더보드 인덱스
+
+    정렬 키는 (-점수, 멤버 ID)이며, 위치 탐색은 이진 탐색(O(log n))으로 한다.
+    길드 규모(수백 명)에서는 리스트 삽입/삭제의 메모리 이동 비용이 무시할 만하다.
+    """
+
+    def __init__(self):
+        self._keys = []      # 정렬된 (-score, member_id) 목록
+        self._scores = {}    # member_id → score
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._scores
+
+    def upsert(self, member_id: int, score: int):
+        """플레이어 점수 추가 또는 갱신"""
+        previous = self._scores.get(member_id)
+        if previous == score:
+            return
+        if previous is not None:
+            self._remove_key((-previous, member_id))
+        self._scores[member_id] = score
+        insort(self._keys, (-score, member_id))
+
+    def remove(self, member_id: int):
+        """플레이어 제거 (없으면 무시)"""
+        previous = self._scores.pop(member_id, None)
+        if previous is not None:
+            self._remove_key((-previous, member_id))
+
+    def _remove_key(self, key: tuple):
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def rank_of(self, member_id: int) -> int:
+        """1부터 시작하는 순위 (없으면 None)"""
+        score = self._scores.get(member_id)
+        if score is None:
+            return None
+        return bisect_left(self._keys, (-score, member_id)) + 1
+
+    def top(self, k: int = None) -> list:
+        """상위 k명의 멤버 ID (k가 없으면 전체)"""
+        keys = self._keys if k is None else self._keys[:k]
+        return [member_id for _, member_id in keys]
+
+    def slice(self, start: int, count: int) -> list:
+        """start(0부터)번째부터 count명의 멤버 ID"""
+        return [member_id for _, member_id in self._keys[start:start + count]]
@@ -0,0 +1,47 @@
+import unicodedata
+from typing import NamedTuple, Optional
+
+
+class NicknameParts(NamedTuple):
+    """'별명/출생년도/롤닉네임#태그' 형식 닉네임을 나눈 결과"""
+    short_name: str
+    birth_year: Optional[str]
+    lol_name: Optional[str]
+    tag: Optional[str]
+
+    @property
+    def has_riot_id(self) -> bool:
+        return bool(self.lol_name and self.tag)
+
+
+def normalize_riot_name(value: str) -> str:
+    """Riot ID 표기 정규화 (NFC 조합형, 연속 공백은 한 칸으로)
+
+    같은 한글 이름이 조합형/분해형으로 입력되거나 공백이 다르게 들어가도
+    같은 문자열이 되도록 한다. 대소문자는 표시용으로 그대로 둔다.
+    """
+    return ' '.join(unicodedata.normalize('NFC', value).split())
+
+
+def riot_id_key(game_name: str, tag: str) -> str:
+    """Riot ID의 정규 키 (Riot은 이름/태그의 대소문자를 구분하지 않는다)"""
+    return f"{normalize_riot_name(game_name).casefold()}#{normalize_riot_name(tag).casefold()}"
+
+
+def parse_nickname(display_name: str) -> NicknameParts:
+    """닉네임에서 별명, 출생년도, 롤 닉네임과 태그 추출"""
+    parts = display_name.split('/')
+    short_name = parts[0].strip()
+    birth_year = parts[1].strip() if len(parts) >= 2 else None
+    lol_name, tag = None, None
+
+    if len(parts) >= 3:
+        lol_full = parts[2].strip()
+        name_parts = lol_full.split('#')
+        if len(name_parts) == 2:
+            name = normalize_riot_name(name_parts[0])
+            name_tag = normalize_riot_name(name_parts[1]).upper()
+            if name and name_tag:
+                lol_name, tag = name, name_tag
+
+    return NicknameParts(short_name, birth_year, lol_name, tag)
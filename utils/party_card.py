@@ -0,0 +1,67 @@
+import discord
+
+from utils.scheduler import DeferredScheduler
+
+# 파티 카드 수정 요청을 모으는 시간(초)
+PARTY_CARD_UPDATE_DELAY = 1.0
+
+
+class PartyCardUpdater:
+    """파티별로 카드 수정 요청을 모아 짧은 간격마다 한 번만 반영하는 업데이터
+
+    입장/퇴장/버튼 이벤트는 카드 수정을 ('card', 파티 ID) key로 스케줄러에 예약만
+    하고, delay초 뒤 그 시점의 파티 상태로 렌더링한 임베드로 한 번만 수정한다. 이미
+    예약되어 있으면 새로 예약하지 않으므로 그 사이의 변경은 한 번의 수정으로 합쳐진다.
+    수정 중에 들어온 변경은 다음 예약에서 반영되므로 마지막 상태가 항상 카드에 남는다.
+    카드 메시지는 보낼 때 받은 객체를 그대로 보관하므로 수정/삭제 전에 다시 조회하지 않는다.
+    """
+
+    def __init__(self, render_embed, scheduler: DeferredScheduler, delay: float = PARTY_CARD_UPDATE_DELAY):
+        self.render_embed = render_embed   # 파티 ID → 임베드 (파티가 없으면 None)
+        self.scheduler = scheduler
+        self.delay = delay
+        self._messages = {}                # 파티 ID → 카드 메시지
+        self._flushing = set()             # 카드를 수정하는 중인 파티 ID
+
+    def track(self, party_id: int, message: discord.Message):
+        """파티 카드 메시지 등록"""
+        self._messages[party_id] = message
+
+    def mark_dirty(self, party_id: int):
+        """카드 수정 예약 (이미 예약되어 있으면 합쳐진다)"""
+        if party_id not in self._messages or ('card', party_id) in self.scheduler:
+            return
+        self.scheduler.schedule(self.delay, self._flush_due, party_id, key=('card', party_id))
+
+    async def _flush_due(self, party_id: int):
+        if party_id in self._flushing:
+            # 이전 수정이 아직 끝나지 않았으면 순서가 뒤바뀌지 않도록 다음 주기로 미룬다
+            self.mark_dirty(party_id)
+            return
+        self._flushing.add(party_id)
+        try:
+            await self.flush(party_id)
+        finally:
+            self._flushing.discard(party_id)
+
+    async def flush(self, party_id: int):
+        """현재 파티 상태로 카드를 즉시 수정"""
+        message = self._messages.get(party_id)
+        embed = self.render_embed(party_id)
+        if message is None or embed is None:
+            return
+        try:
+            await message.edit(embed=embed)
+        except discord.NotFound:
+            self._messages.pop(party_id, None)
+        except discord.HTTPException as e:
+            print(f"파티 카드 수정 실패 ({party_id}): {e}")
+
+    def forget(self, party_id: int) -> discord.Message:
+        """예약된 수정을 취소하고 카드 메시지를 반환 (삭제는 호출한 쪽에서)"""
+        self.scheduler.cancel(('card', party_id))
+        return self._messages.pop(party_id, None)
+
+    def cancel_all(self):
+        for party_id in self._messages:
+            self.scheduler.cancel(('card', party_id))
@@ -0,0 +1,720 @@
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+
+import discord
+
+from utils.party_card import PartyCardUpdater
+from utils.party_mailbox import PartyMailboxes
+from utils.party_store import PartyStore
+from utils.scheduler import get_scheduler
+
+VERIFIED_ROLE_NAME = "인증완료"
+
+# 파티 상태 변경을 모아서 저장하는 간격(초)
+PARTY_STATE_FLUSH_DELAY = float(os.getenv('PARTY_STATE_FLUSH_DELAY', '0.5'))
+# 마지막 멤버가 나간 뒤 채널이 비었는지 확인하기까지의 대기(초)
+PARTY_EMPTY_CHECK_DELAY = 0.5
+
+
+class PartyType(ABC):
+    """파티 종류별로 달라지는 부분(설정 UI, 카드 모양, 채널)을 정의하는 플러그인
+
+    PartyEngine에 등록하면 트리거 채널 입장, 파티 채널 입/퇴장, 카드 버튼, 파티
+    정리는 엔진이 공통으로 처리한다. 하위 클래스는 setup_embed, setup_view,
+    card_view만 구현하면 된다 (구현하지 않으면 인스턴스를 만들 때 TypeError).
+    """
+
+    name = None                          # 엔진 안에서 쓰는 고유 이름
+    label = "파티"                       # 안내 문구에 쓰는 이름 (예: "자유 파티")
+    card_color = discord.Color.blue()
+    game_field_name = "🕹️ 게임 모드"
+    text_channel_attr = None             # 봇 객체의 텍스트 채널 ID 속성 이름
+    trigger_channel_attr = None          # 봇 객체의 생성 트리거 음성 채널 ID 속성 이름
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @property
+    def text_channel_id(self) -> int:
+        return getattr(self.bot, self.text_channel_attr, 0)
+
+    @property
+    def trigger_channel_id(self) -> int:
+        return getattr(self.bot, self.trigger_channel_attr, 0)
+
+    @property
+    def compact_label(self) -> str:
+        """채널/스레드 이름용 (띄어쓰기 제거)"""
+        return self.label.replace(' ', '')
+
+    @abstractmethod
+    def setup_embed(self, member: discord.Member) -> discord.Embed:
+        """설정 스레드에 보낼 안내 임베드"""
+
+    @abstractmethod
+    def setup_view(self, member: discord.Member, thread: discord.Thread) -> discord.ui.View:
+        """설정 스레드에 보낼 파티 설정 View"""
+
+    @abstractmethod
+    def card_view(self, party_vc_id: int) -> discord.ui.View:
+        """파티 카드에 붙는 참가/관전 버튼 View"""
+
+
+class PartyEngine:
+    """모든 파티 종류가 함께 쓰는 파티 엔진
+
+    음성 상태 이벤트는 엔진의 리스너 하나만 받는다. 입장한 채널 ID로 처리 함수
+    테이블(트리거 채널 → 설정 시작, 파티 채널 → 자동 배정)을 한 번 조회하고,
+    퇴장은 떠난 채널 ID로 파티를 바로 찾으므로 이벤트당 비용은 파티 종류나 진행
+    중인 파티 수와 무관하다.
+
+    파티 상태는 바뀔 때마다 저장 대상으로 표시되고, 짧은 간격으로 모아서 PartyStore에
+    한 트랜잭션으로 기록된다. 재시작 후에는 저장된 파티를 실제 음성 채널 멤버와 맞춰
+    복원하고, 파티 카드 버튼을 메시지 ID로 다시 연결한다.
+
+    한 파티의 상태를 바꾸는 작업(입장, 퇴장, 버튼, 파티 공개, 정리)은 모두 그 파티의
+    메일박스를 거쳐 도착 순서대로 하나씩 적용된다. 그래서 await 사이에 입장과 퇴장이
+    섞여 정원을 넘기거나, 누군가 들어오는 중에 채널이 지워지는 일이 없다.
+    """
+
+    def __init__(self, bot, store: PartyStore = None):
+        self.bot = bot
+        self.types = {}                  # 이름 → PartyType
+        self.routes = {}                 # 채널 ID → 입장 처리 함수
+        self.active_parties = {}         # 파티 음성 채널 ID → 파티 정보
+        self.setup_threads = {}          # 파티장 ID → 설정 스레드 ID
+        self.card_parties = {}           # 파티 카드 메시지 ID → 파티 채널 ID
+        self._verified_roles = {}        # 길드 ID → 인증완료 역할 ID
+        self.scheduler = get_scheduler(bot)
+        # 파티 카드 수정 요청을 파티별로 모아서 반영
+        self.card_updater = PartyCardUpdater(self.render_party_card, self.scheduler)
+        self.mailboxes = PartyMailboxes()
+        self._listening = False
+
+        self.store = store or PartyStore()
+        self._unsaved = set()            # 저장이 필요한 파티 채널 ID (없어진 파티는 삭제)
+        self._save_lock = asyncio.Lock()  # 저장 순서 보장 (이전 배치가 나중 배치를 덮어쓰지 않도록)
+        self._rehydrated = False
+
+    # --- 파티 종류 등록 ---
+    def register(self, party_type: PartyType):
+        if self.store is None:
+            # 모든 파티 Cog가 내려가면서 닫힌 저장소는 다시 불러올 때 새로 연다
+            self.store = PartyStore()
+        self.types[party_type.name] = party_type
+        self.rebuild_routes()
+        if not self._listening:
+            self.bot.add_listener(self.on_voice_state_update)
+            # 채널 ID는 setup_hook 끝에서 봇 객체에 등록되므로 접속 후 다시 구성
+            self.bot.add_listener(self.on_ready, 'on_ready')
+            self._listening = True
+        # 봇이 이미 접속한 뒤 등록된 종류(Cog 재로드)는 바로 복원
+        if self._rehydrated:
+            asyncio.create_task(self.rehydrate())
+
+    async def unregister(self, party_type: PartyType):
+        self.types.pop(party_type.name, None)
+        self.rebuild_routes()
+        if not self.types and self._listening:
+            self.bot.remove_listener(self.on_voice_state_update)
+            self.bot.remove_listener(self.on_ready, 'on_ready')
+            # 내려간 엔진을 부르는 예약이 남지 않도록 엔진의 예약은 모두 취소
+            self.card_updater.cancel_all()
+            for party_id in self.active_parties:
+                self.scheduler.cancel(('party_empty', party_id))
+            self.mailboxes.cancel_all()
+            self._listening = False
+            # 남은 변경은 바로 저장하고 저장소를 닫는다
+            self.scheduler.cancel('party_state')
+            await self.save_state()
+            self.store.close()
+            self.store = None
+
+    def rebuild_routes(self):
+        """채널 ID → 처리 함수 테이블 재구성"""
+        routes = {party_id: self.on_party_join for party_id in self.active_parties}
+        for party_type in self.types.values():
+            if party_type.trigger_channel_id:
+                routes[party_type.trigger_channel_id] = partial(self.on_trigger_join, party_type)
+        self.routes = routes
+
+    async def on_ready(self):
+        self.rebuild_routes()
+        if not self._rehydrated:
+            self._rehydrated = True
+            await self.rehydrate()
+
+    # --- 상태 저장 ---
+    def mark_unsaved(self, party_id: int):
+        """파티 상태 저장 예약 (짧은 시간 안의 변경은 한 번의 쓰기로 합쳐진다)"""
+        self._unsaved.add(party_id)
+        if 'party_state' not in self.scheduler:
+            self.scheduler.schedule(PARTY_STATE_FLUSH_DELAY, self.save_state, key='party_state')
+
+    async def save_state(self):
+        """저장 대상 파티를 한 트랜잭션으로 기록 (SQLite 쓰기는 스레드에서 실행)
+
+        쓰는 동안에도 이벤트 루프에서 파티 정보가 바뀔 수 있으므로 저장할 내용은
+        루프에서 복사해 넘긴다.
+        """
+        async with self._save_lock:
+            if not self._unsaved or self.store is None:
+                return
+            party_ids, self._unsaved = self._unsaved, set()
+            changed = {
+                pid: dict(info, participants=set(info['participants']), spectators=set(info['spectators']))
+                for pid, info in self.active_parties.items() if pid in party_ids
+            }
+            removed = [pid for pid in party_ids if pid not in self.active_parties]
+            try:
+                await asyncio.to_thread(self.store.save_changes, changed, removed)
+            except Exception as e:
+                print(f"파티 상태 저장 실패: {e}")
+                self._unsaved |= party_ids
+
+    # --- 공용 도우미 ---
+    @staticmethod
+    def get_short_name(display_name: str) -> str:
+        """'별명/출생년도/롤닉네임' 형식에서 '별명'만 추출합니다."""
+        try:
+            return display_name.split('/')[0].strip()
+        except:
+            return display_name
+
+    def short_name_of(self, member: discord.Member) -> str:
+        """멤버의 별명 (공용 멤버 레지스트리에 파싱된 값 우선 사용)"""
+        registry = self.bot.get_cog('MemberRegistry')
+        if registry:
+            return registry.get(member).short_name
+        return self.get_short_name(member.display_name)
+
+    def has_verified_role(self, member: discord.Member) -> bool:
+        """멤버가 인증완료 역할을 가지고 있는지 확인 (역할 ID는 길드별로 기억)"""
+        guild = member.guild
+        role = guild.get_role(self._verified_roles.get(guild.id, 0))
+        if role is None or role.name != VERIFIED_ROLE_NAME:
+            role = discord.utils.get(guild.roles, name=VERIFIED_ROLE_NAME)
+            if role is None:
+                return False
+            self._verified_roles[guild.id] = role.id
+        return member.get_role(role.id) is not None
+
+    def party_type_of(self, party_info: dict) -> PartyType:
+        return self.types.get(party_info['type'])
+
+    @staticmethod
+    def _is_listed(party_info: dict, member_id: int) -> bool:
+        return member_id in party_info['participants'] or member_id in party_info['spectators']
+
+    def _assign(self, party_id: int, member_id: int, role: str):
+        """멤버를 이 파티의 'participants' 또는 'spectators'로 등록 (이 파티 안의 기존 등록만 바꾼다)
+
+        다른 파티에서 옮겨 온 경우 그 파티에서의 제거는 그 파티의 퇴장 처리가 자기
+        메일박스에서 맡는다. 파티 상태는 항상 그 파티의 메일박스 안에서만 바뀐다.
+        """
+        party_info = self.active_parties[party_id]
+        party_info['participants'].discard(member_id)
+        party_info['spectators'].discard(member_id)
+        party_info[role].add(member_id)
+        self.mark_unsaved(party_id)
+
+    def _release(self, party_id: int, member_id: int) -> bool:
+        """이 파티에서 멤버 등록 해제 (등록되어 있었으면 True)"""
+        party_info = self.active_parties.get(party_id)
+        if not party_info or not self._is_listed(party_info, member_id):
+            return False
+        party_info['participants'].discard(member_id)
+        party_info['spectators'].discard(member_id)
+        self.mark_unsaved(party_id)
+        return True
+
+    # --- 파티 카드 ---
+    def build_party_card_embed(self, party_info: dict) -> discord.Embed:
+        """현재 파티 상태로 파티 카드 임베드 생성 (파티 종류나 카드 채널이 없으면 None)"""
+        party_type = self.party_type_of(party_info)
+        text_channel = self.bot.get_channel(party_type.text_channel_id) if party_type else None
+        if text_channel is None:
+            return None
+        guild = text_channel.guild
+
+        # 참가자/관전자 목록을 짧은 이름으로 변환
+        participants_names = []
+        for uid in party_info['participants']:
+            user = guild.get_member(uid)
+            participants_names.append(self.short_name_of(user) if user else f"나간 유저({uid})")
+
+        spectators_names = []
+        for uid in party_info['spectators']:
+            user = guild.get_member(uid)
+            spectators_names.append(self.short_name_of(user) if user else f"나간 유저({uid})")
+
+        leader_name = party_info['leader_name']
+        embed = discord.Embed(title=f"🎉 {leader_name}님의 파티가 열렸습니다!", color=party_type.card_color)
+        embed.add_field(name=party_type.game_field_name, value=party_info['game_mode'], inline=False)
+        embed.add_field(name="📊 현재 인원", value=f"{len(party_info['participants'])} / {party_info['max_size']}", inline=False)
+        embed.add_field(name="👥 참가자 목록", value='\n'.join(participants_names) if participants_names else "없음", inline=True)
+        embed.add_field(name="👀 관전자 목록", value='\n'.join(spectators_names) if spectators_names else "없음", inline=True)
+        embed.set_footer(text=f"음성 채널: {leader_name}님의 파티")
+        return embed
+
+    def render_party_card(self, party_vc_id: int) -> discord.Embed:
+        """업데이터가 카드를 수정할 때 호출 (파티가 없거나 아직 설정 중이면 None)"""
+        party_info = self.active_parties.get(party_vc_id)
+        if not party_info or not party_info.get("party_card_message_id"):
+            return None
+        return self.build_party_card_embed(party_info)
+
+    async def handle_card_join(self, interaction: discord.Interaction, party_vc_id: int, join_type: str):
+        """파티 카드의 참가자/관전자 버튼 처리"""
+        user = interaction.user
+        # 메시지 ID로 다시 연결되지 않은 카드(기본 등록된 View)는 메시지 ID로 파티를 찾는다
+        party_vc_id = self.card_parties.get(interaction.message.id, party_vc_id)
+
+        # 인증완료 역할 확인
+        if not self.has_verified_role(user):
+            await interaction.response.send_message(
+                "❌ **파티 참여 권한이 없습니다.**\n\n"
+                "파티에 참여하려면 먼저 온보딩 과정을 완료해야 합니다.\n"
+                "📍 #입장-온보딩 채널에서 닉네임 설정과 역할 선택을 완료해주세요.",
+                ephemeral=True
+            )
+            return
+
+        if not user.voice or user.voice.channel.id != party_vc_id:
+            await interaction.response.send_message("❗ 먼저 파티 음성 채널에 참여해야 합니다.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        # 배정은 파티 메일박스에서 다른 입장/퇴장 이벤트와 순서대로 처리
+        reply = await self.mailboxes.submit(party_vc_id, self._apply_card_join, party_vc_id, user.id, join_type)
+        if reply is None:
+            return
+        await interaction.followup.send(reply, ephemeral=True)
+
+        if party_vc_id not in self.active_parties:
+            await interaction.message.delete()
+
+    async def _apply_card_join(self, party_vc_id: int, user_id: int, join_type: str) -> str:
+        """카드 버튼에 따른 배정 (파티 메일박스 안에서 실행, 사용자에게 보낼 안내 반환)"""
+        party_info = self.active_parties.get(party_vc_id)
+        if not party_info:
+            return None
+
+        # 참가자 버튼을 누른 경우
+        if join_type == 'participant':
+            if user_id in party_info['participants']:
+                return "이미 참가자로 등록되어 있습니다."
+
+            if len(party_info['participants']) >= party_info['max_size']:
+                self._assign(party_vc_id, user_id, 'spectators')
+                reply = "파티 인원이 가득 차서 관전자로 배정되었습니다."
+            else:
+                self._assign(party_vc_id, user_id, 'participants')
+                reply = "참가자로 배정되었습니다."
+
+        else:
+            if user_id in party_info['spectators']:
+                return "이미 관전자로 등록되어 있습니다."
+
+            self._assign(party_vc_id, user_id, 'spectators')
+            reply = "관전자로 배정되었습니다."
+
+        # 바로 수정하지 않고 예약만 한다 (짧은 시간 안의 변경은 한 번의 수정으로 합쳐진다)
+        self.card_updater.mark_dirty(party_vc_id)
+        return reply
+
+    # --- 파티 생성 ---
+    async def open_party(self, party_type: PartyType, interaction: discord.Interaction,
+                         author: discord.Member, thread: discord.Thread, game_mode: str, max_size: int) -> bool:
+        """설정이 끝난 파티를 공개: 채널 이름 변경, 파티 카드 생성, 설정 스레드 삭제"""
+        if not author.voice:
+            return False
+
+        party_vc = author.voice.channel
+        opened = await self.mailboxes.submit(
+            party_vc.id, self._apply_open, party_type, author, party_vc, game_mode, max_size
+        )
+        if not opened:
+            return False
+
+        # 성공 메시지를 스레드에 보냄
+        await interaction.followup.send(f"✅ {party_type.label}가 성공적으로 생성되었습니다! 메인 채널에서 파티 카드를 확인하세요.")
+
+        # 스레드 자동 삭제 (5초 후)
+        self.scheduler.delete_later(thread, 5)
+        return True
+
+    async def _apply_open(self, party_type: PartyType, author: discord.Member, party_vc,
+                          game_mode: str, max_size: int) -> bool:
+        """파티 정보 확정, 채널 이름 변경, 카드 전송 (파티 메일박스 안에서 실행)"""
+        party_info = self.active_parties.get(party_vc.id)
+        # 생성 버튼을 두 번 눌러도 카드는 한 장만 만든다
+        if not party_info or party_info.get("party_card_message_id"):
+            return False
+
+        # 카드를 올릴 채널이 없으면 (채널 삭제, ID 미설정) 파티를 공개하지 않는다
+        main_channel = self.bot.get_channel(party_type.text_channel_id)
+        if main_channel is None:
+            print(f"{party_type.label} 카드 채널을 찾을 수 없습니다: {party_type.text_channel_id}")
+            return False
+
+        # 짧은 이름 추출
+        short_name = self.short_name_of(author)
+
+        party_info.update({
+            "game_mode": game_mode,
+            "max_size": max_size,
+            "leader_name": short_name,
+        })
+        self._assign(party_vc.id, author.id, 'participants')
+
+        # 채널 이름 변경 및 잠금 해제
+        await party_vc.edit(
+            name=f"{short_name}님의 파티",
+            user_limit=None
+        )
+
+        # 파티 카드 생성 (메인 채널에)
+        party_card_view = party_type.card_view(party_vc.id)
+        party_card_msg = await main_channel.send(embed=self.build_party_card_embed(party_info), view=party_card_view)
+        party_info["party_card_message_id"] = party_card_msg.id
+        self.card_parties[party_card_msg.id] = party_vc.id
+        self.card_updater.track(party_vc.id, party_card_msg)
+        self.mark_unsaved(party_vc.id)
+        return True
+
+    # --- 음성 상태 이벤트 ---
+    async def on_voice_state_update(self, member, before, after):
+        # 같은 채널 안의 상태 변화(음소거, 화면 공유 등)는 파티와 무관
+        if before.channel == after.channel:
+            return
+
+        if after.channel:
+            handler = self.routes.get(after.channel.id)
+            # 권한이 없어 원래 채널로 돌려보낸 경우 퇴장 처리는 하지 않는다
+            if handler and await handler(member, before, after):
+                return
+
+        if before.channel and before.channel.id in self.active_parties:
+            await self.on_party_leave(member, before.channel)
+
+    async def reject_unverified(self, member, before, party_type: PartyType, action: str):
+        """인증완료 역할이 없는 멤버에게 안내 후 원래 채널로 돌려보냄 (action: '생성' 또는 '참여')"""
+        if party_type is None:
+            # 파티 종류의 Cog가 내려간 사이의 입장: 안내 문구를 만들 수 없으므로 처리하지 않는다
+            return
+        label = party_type.label
+        if action == '생성':
+            requirement, subject, object_ = f"{label}를 생성하려면", "생성이", "생성을"
+        else:
+            requirement, subject, object_ = f"{label}에 참여하려면", "참여가", "참여를"
+        try:
+            dm_embed = discord.Embed(
+                title=f"❌ {label} {action} 권한 없음",
+                description=f"{requirement} 먼저 **온보딩 과정**을 완료해야 합니다.\n\n"
+                           "🔹 #입장-온보딩 채널에서 닉네임 설정과 역할 선택을 완료해주세요.\n"
+                           f"🔹 온보딩 완료 후 '인증완료' 역할을 받으면 파티 {subject} 가능합니다.",
+                color=discord.Color.red()
+            )
+            await member.send(embed=dm_embed)
+        except:
+            welcome_channel = self.bot.get_channel(self.bot.welcome_channel_id)
+            if welcome_channel:
+                temp_msg = await welcome_channel.send(
+                    f"❌ {member.mention}님, {label} {object_} 위해서는 온보딩 과정을 먼저 완료해주세요!"
+                )
+                self.scheduler.delete_later(temp_msg, 5)
+
+        if before.channel:
+            await member.move_to(before.channel)
+        else:
+            await member.move_to(None)
+
+    async def on_trigger_join(self, party_type: PartyType, member, before, after) -> bool:
+        """파티 생성 채널에 입장: 임시 음성 채널과 비공개 설정 스레드 생성"""
+        # 인증완료 역할 확인
+        if not self.has_verified_role(member):
+            await self.reject_unverified(member, before, party_type, '생성')
+            return True
+
+        # 이미 설정 중인 스레드가 있다면 무시
+        if member.id in self.setup_threads:
+            await member.move_to(before.channel)
+            return True
+        # 스레드가 만들어지기 전에 다시 들어와도 설정이 두 번 시작되지 않도록 먼저 자리 표시
+        self.setup_threads[member.id] = None
+
+        main_channel = self.bot.get_channel(party_type.text_channel_id)
+        category = after.channel.category
+        if main_channel is None or category is None:
+            self.setup_threads.pop(member.id, None)
+            print(f"{party_type.label} 설정을 시작할 수 없습니다: 텍스트 채널 또는 트리거 채널 카테고리 없음")
+            return False
+
+        short_name = self.short_name_of(member)
+        temp_vc = thread = None
+        try:
+            # 임시 음성 채널 생성 (1명 제한으로 잠금)
+            temp_vc = await category.create_voice_channel(
+                name=f"{short_name}님의 {party_type.compact_label}설정 도우미",
+                user_limit=1
+            )
+            # 옮기기 전에 트리거 채널을 나가면 여기서 실패한다
+            await member.move_to(temp_vc)
+
+            # 메인 텍스트 채널에서 비공개 스레드 생성
+            thread = await main_channel.create_thread(
+                name=f"{short_name}님의 {party_type.compact_label}-생성-도우미",
+                type=discord.ChannelType.private_thread,
+                auto_archive_duration=60
+            )
+
+            await thread.add_user(member)
+
+            setup_view = party_type.setup_view(member, thread)
+            setup_msg = await thread.send(embed=party_type.setup_embed(member), view=setup_view)
+
+            # 추적 정보 저장
+            self.setup_threads[member.id] = thread.id
+            self.active_parties[temp_vc.id] = {
+                "type": party_type.name,
+                "leader_id": member.id,
+                "setup_message_id": setup_msg.id,
+                "thread_id": thread.id,
+                "party_card_message_id": None,
+                "game_mode": None,
+                "max_size": 0,
+                "participants": set(),
+                "spectators": set()
+            }
+            self.routes[temp_vc.id] = self.on_party_join
+            self.mark_unsaved(temp_vc.id)
+
+        except Exception as e:
+            # 자리 표시를 풀고 만든 채널/스레드를 정리해야 다음 입장에서 다시 시작할 수 있다
+            print(f"{party_type.label} 설정 시작 실패 ({member.display_name}): {e}")
+            self.setup_threads.pop(member.id, None)
+            for created in (thread, temp_vc):
+                if created is None:
+                    continue
+                try:
+                    await created.delete()
+                except discord.HTTPException:
+                    pass
+            if member.voice and before.channel:
+                try:
+                    await member.move_to(before.channel)
+                except discord.HTTPException:
+                    pass
+        return False
+
+    async def on_party_join(self, member, before, after) -> bool:
+        """파티 채널에 입장: 참가자 자리가 있으면 참가자로, 없으면 관전자로 자동 배정"""
+        party_id = after.channel.id
+        party_info = self.active_parties.get(party_id)
+        if not party_info:
+            return False
+        # 누군가 들어왔으므로 예약된 빈 채널 확인은 필요 없다
+        self.scheduler.cancel(('party_empty', party_id))
+
+        # 인증완료 역할 확인 (파티장 제외)
+        if member.id != party_info['leader_id'] and not self.has_verified_role(member):
+            await self.reject_unverified(member, before, self.party_type_of(party_info), '참여')
+            return True
+
+        await self.mailboxes.submit(party_id, self._apply_join, party_id, member.id)
+        return False
+
+    async def _apply_join(self, party_id: int, member_id: int):
+        """입장한 멤버 배정 (파티 메일박스 안에서 실행)"""
+        party_info = self.active_parties.get(party_id)
+        if not party_info:
+            return
+
+        # 파티장이 재입장한 경우 무조건 참가자로 등록
+        if member_id == party_info['leader_id']:
+            if member_id not in party_info['participants']:
+                self._assign(party_id, member_id, 'participants')
+                self.card_updater.mark_dirty(party_id)
+            return
+
+        # 이미 이 파티에 등록된 멤버는 그대로 둔다 (새로 입장한 멤버만 처리)
+        if not self._is_listed(party_info, member_id):
+            if len(party_info['participants']) < party_info['max_size']:
+                self._assign(party_id, member_id, 'participants')
+            else:
+                self._assign(party_id, member_id, 'spectators')
+            self.card_updater.mark_dirty(party_id)
+
+    async def on_party_leave(self, member, channel):
+        """파티 채널에서 퇴장: 목록에서 제거하고, 채널이 비면 파티 정리"""
+        await self.mailboxes.submit(channel.id, self._apply_leave, channel.id, member.id)
+
+        # 채널 상태가 반영될 시간을 두고 비었는지 확인 (그 사이 재입장하면 취소된다)
+        self.scheduler.schedule(
+            PARTY_EMPTY_CHECK_DELAY, self.mailboxes.submit, channel.id, self._close_if_empty, channel.id,
+            key=('party_empty', channel.id)
+        )
+
+    async def _apply_leave(self, party_id: int, member_id: int):
+        if self._release(party_id, member_id):
+            # 파티 카드 업데이트 예약
+            self.card_updater.mark_dirty(party_id)
+
+    async def _close_if_empty(self, party_id: int):
+        """채널이 비어 있으면 파티 정리 (파티 메일박스 안에서 실행)"""
+        channel = self.bot.get_channel(party_id)
+        if channel and not channel.members and party_id in self.active_parties:
+            await self.close_party(party_id)
+
+    async def close_party(self, party_id: int):
+        """파티 정보, 카드, 설정 스레드, 음성 채널 정리"""
+        party_info = self.active_parties.pop(party_id)
+        self.routes.pop(party_id, None)
+        self.card_parties.pop(party_info.get("party_card_message_id"), None)
+        self.mark_unsaved(party_id)
+
+        if party_info["leader_id"] in self.setup_threads:
+            del self.setup_threads[party_info["leader_id"]]
+
+        # 파티 카드 삭제 (예약된 수정도 취소)
+        card_msg = self.card_updater.forget(party_id)
+        if card_msg:
+            try:
+                await card_msg.delete()
+            except discord.NotFound:
+                pass
+
+        # 설정 스레드 삭제
+        if party_info.get("thread_id"):
+            try:
+                thread = self.bot.get_channel(party_info["thread_id"])
+                if thread:
+                    await thread.delete()
+            except:
+                pass
+
+        party_type = self.party_type_of(party_info)
+        label = party_type.label if party_type else "파티"
+        channel = self.bot.get_channel(party_id)
+        if channel:
+            try:
+                await channel.delete(reason=f"{label} 채널에 사용자가 없음")
+            except discord.NotFound:
+                pass
+
+    # --- 재시작 후 복원 ---
+    async def rehydrate(self):
+        """저장된 파티를 실제 음성 채널 상태와 맞춰 복원하고, 주인 없는 파티 채널 정리
+
+        등록되지 않은 종류의 파티는 저장소에 그대로 두고, 그 종류가 등록될 때 복원한다.
+        """
+        started = time.perf_counter()
+        try:
+            stored = await asyncio.to_thread(self.store.load_parties)
+        except Exception as e:
+            print(f"파티 상태 불러오기 실패: {e}")
+            return
+
+        restored = closed = 0
+        for party_id, party_info in stored.items():
+            party_type = self.types.get(party_info['type'])
+            if party_id in self.active_parties or party_type is None:
+                continue
+            channel = self.bot.get_channel(party_id)
+            self.restore_party(party_type, party_id, party_info, channel)
+            if channel is None or not channel.members:
+                await self.mailboxes.submit(party_id, self.close_party, party_id)
+                closed += 1
+            else:
+                if not party_info.get("party_card_message_id"):
+                    await self.resume_setup(party_type, party_id, party_info)
+                restored += 1
+
+        swept = await self.sweep_orphan_channels()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"파티 복원 완료: {restored}개 복원, {closed}개 정리, 주인 없는 채널 {swept}개 삭제 ({elapsed:.0f}ms)")
+
+    def restore_party(self, party_type: PartyType, party_id: int, party_info: dict, channel):
+        """저장된 파티 정보를 메모리에 올리고, 현재 채널 멤버로 참가자/관전자 목록을 다시 계산"""
+        present = {member.id for member in channel.members} if channel else set()
+        party_info['participants'] &= present
+        party_info['spectators'] &= present
+
+        self.active_parties[party_id] = party_info
+        self.routes[party_id] = self.on_party_join
+
+        # 재시작 중에 들어온 멤버는 입장 순서대로 자동 배정 (파티장은 항상 참가자)
+        if channel and party_info.get("party_card_message_id"):
+            for member in channel.members:
+                if member.id == party_info['leader_id']:
+                    if member.id not in party_info['participants']:
+                        self._assign(party_id, member.id, 'participants')
+                elif not self._is_listed(party_info, member.id):
+                    role = 'participants' if len(party_info['participants']) < party_info['max_size'] else 'spectators'
+                    self._assign(party_id, member.id, role)
+
+        if not party_info.get("party_card_message_id"):
+            self.setup_threads[party_info['leader_id']] = party_info['thread_id']
+            return
+
+        # 카드 메시지는 다시 조회하지 않고 ID로 만든 PartialMessage로 수정/삭제한다
+        card_id = party_info["party_card_message_id"]
+        text_channel = self.bot.get_channel(party_type.text_channel_id)
+        if text_channel:
+            self.card_updater.track(party_id, text_channel.get_partial_message(card_id))
+        self.card_parties[card_id] = party_id
+        if present:
+            self.bot.add_view(party_type.card_view(party_id), message_id=card_id)
+            self.card_updater.mark_dirty(party_id)
+        self.mark_unsaved(party_id)
+
+    async def resume_setup(self, party_type: PartyType, party_id: int, party_info: dict):
+        """재시작으로 사라진 설정 View를 설정 스레드에 다시 보냄"""
+        thread = self.bot.get_channel(party_info['thread_id'])
+        guild = thread.guild if thread else None
+        leader = guild.get_member(party_info['leader_id']) if guild else None
+        if not thread or not leader:
+            return
+        try:
+            setup_msg = await thread.send(embed=party_type.setup_embed(leader), view=party_type.setup_view(leader, thread))
+            party_info["setup_message_id"] = setup_msg.id
+            self.mark_unsaved(party_id)
+        except discord.HTTPException as e:
+            print(f"파티 설정 View 복원 실패 ({thread.id}): {e}")
+
+    async def sweep_orphan_channels(self) -> int:
+        """트리거 채널과 같은 카테고리에 남은, 추적되지 않는 빈 파티 채널 삭제"""
+        swept = 0
+        checked = set()
+        for party_type in self.types.values():
+            trigger = self.bot.get_channel(party_type.trigger_channel_id)
+            category = trigger.category if trigger else None
+            if category is None or category.id in checked:
+                continue
+            checked.add(category.id)
+            for channel in category.voice_channels:
+                if channel.id in self.routes or channel.members:
+                    continue
+                if channel.name.endswith("님의 파티") or channel.name.endswith("도우미"):
+                    try:
+                        await channel.delete(reason="복원되지 않은 빈 파티 채널")
+                        swept += 1
+                    except discord.HTTPException:
+                        pass
+        return swept
+
+
+def get_party_engine(bot) -> PartyEngine:
+    """봇에 하나뿐인 파티 엔진 (처음 호출할 때 생성)
+
+    엔진은 봇 객체에 붙어 있으므로 파티 Cog를 다시 불러와도 진행 중인 파티가 유지된다.
+    """
+    engine = getattr(bot, 'party_engine', None)
+    if engine is None:
+        engine = bot.party_engine = PartyEngine(bot)
+    return engine
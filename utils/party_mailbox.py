@@ -0,0 +1,63 @@
+import asyncio
+from collections import deque
+
+
+class PartyMailboxes:
+    """파티별 메일박스: 같은 파티의 작업은 도착 순서대로 하나씩, 다른 파티는 동시에 처리
+
+    파티마다 처리 Task가 하나씩 돌며 큐가 비면 종료하므로, 조용한 파티는 메모리를
+    거의 쓰지 않는다. 전역 Lock이 없어서 한 파티의 느린 작업(채널 수정, 카드 전송)이
+    다른 파티의 이벤트를 막지 않는다.
+    """
+
+    def __init__(self):
+        self._queues = {}                # 파티 ID → (작업, 인자, Future) 큐
+        self._workers = {}               # 파티 ID → 처리 Task
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    async def submit(self, party_id: int, action, *args):
+        """파티 메일박스에 작업(코루틴 함수)을 넣고 그 결과를 기다림
+
+        같은 파티의 작업 안에서 다시 호출하면 바로 실행한다 (자기 자신을 기다리지 않도록).
+        기다리던 쪽이 취소되어도 이미 시작한 작업은 끝까지 실행된다.
+        """
+        if self._workers.get(party_id) is asyncio.current_task():
+            return await action(*args)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(party_id, deque()).append((action, args, future))
+        if party_id not in self._workers:
+            self._workers[party_id] = asyncio.create_task(self._drain(party_id))
+        return await future
+
+    async def _drain(self, party_id: int):
+        queue = self._queues[party_id]
+        try:
+            while queue:
+                action, args, future = queue.popleft()
+                if future.done():
+                    continue
+                try:
+                    result = await action(*args)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            del self._workers[party_id]
+            if queue:
+                # 처리 Task가 취소된 경우: 남은 작업도 취소로 끝낸다
+                for _, _, future in queue:
+                    future.cancel()
+            del self._queues[party_id]
+
+    def cancel_all(self):
+        for worker in self._workers.values():
+            worker.cancel()
@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+
+class PartyStore:
+    """진행 중인 파티 상태를 보관하는 SQLite 저장소 (재시작 후 복원용)
+
+    - parties: 파티 음성 채널 ID → 파티 종류와 파티 정보(JSON)
+
+    변경은 save_changes로 여러 파티를 한 트랜잭션에 묶어 쓰므로, 쓰는 도중 봇이
+    종료되어도 직전 배치 상태가 그대로 남는다.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DATA_DIR, 'party.db')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS parties (
+                    channel_id INTEGER PRIMARY KEY,
+                    party_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _encode(party_info: dict) -> str:
+        payload = dict(party_info)
+        payload['participants'] = sorted(party_info['participants'])
+        payload['spectators'] = sorted(party_info['spectators'])
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+    def save_changes(self, changed: dict, removed):
+        """변경된 파티({채널 ID: 파티 정보})와 끝난 파티(채널 ID 목록)를 한 번에 반영"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parties (channel_id, party_type, payload, updated_at) VALUES (?, ?, ?, ?)",
+                [(channel_id, info['type'], self._encode(info), now) for channel_id, info in changed.items()]
+            )
+            self._conn.executemany(
+                "DELETE FROM parties WHERE channel_id = ?", [(channel_id,) for channel_id in removed]
+            )
+
+    def load_parties(self) -> dict:
+        """저장된 파티 전체 {채널 ID: 파티 정보} (참가자/관전자는 set으로 복원)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT channel_id, payload FROM parties").fetchall()
+        parties = {}
+        for row in rows:
+            party_info = json.loads(row['payload'])
+            party_info['participants'] = set(party_info['participants'])
+            party_info['spectators'] = set(party_info['spectators'])
+            parties[row['channel_id']] = party_info
+        return parties
@@ -0,0 +1,360 @@
+import asyncio
+import time
+from urllib.parse import quote
+
+import aiohttp
+
+from utils.nickname import riot_id_key
+from utils.ranking_store import RankingStore
+from utils.riot_api import RiotKeyPool, ACCOUNT_HOST, PLATFORM_HOST
+
+# 큐 타입 ↔ Riot 큐 ID
+QUEUE_IDS = {'solo': 'RANKED_SOLO_5x5', 'flex': 'RANKED_FLEX_SR'}
+# 최상위 티어 → 리그 전체를 한 번에 돌려주는 league-v4 엔드포인트
+APEX_LEAGUE_ENDPOINTS = {
+    'CHALLENGER': 'challengerleagues',
+    'GRANDMASTER': 'grandmasterleagues',
+    'MASTER': 'masterleagues',
+}
+
+
+class RankingCollector:
+    """Riot API로 랭크 데이터를 수집하는 부분 (디스코드 객체에 의존하지 않는다)
+
+    수집 대상은 (멤버 ID, 디스코드 표시 이름, 롤 닉네임, 태그) 튜플로 받으므로
+    봇 프로세스 안에서도, 별도의 워커 프로세스에서도 같은 코드로 동작한다.
+    계정 조회는 예산이 가장 많은 키로 보내고, 이후 그 계정의 PUUID / 소환사 ID를
+    쓰는 요청은 모두 같은 키(key_id)로 보낸다.
+    """
+
+    def __init__(self, key_pool: RiotKeyPool, ranking_store: RankingStore, concurrency: int = 8):
+        self.key_pool = key_pool
+        self.ranking_store = ranking_store
+        self.concurrency = concurrency
+
+    async def make_api_request(self, host: str, method: str, path: str, riot_key: str = None,
+                               key_id: str = None) -> dict:
+        """Rate Limit을 준수하는 비동기 API 요청
+        
+        riot_key가 주어지면 404/400(없는 계정, 잘못된 태그)을 네거티브 캐시에 기록한다
+        (기록은 이벤트 루프를 막지 않도록 스레드에서 실행).
+        key_id가 없으면 예산이 가장 많은 키로 보낸다.
+        """
+        try:
+            response = await self.key_pool.request(host, method, path, key_id=key_id)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"요청 오류: {e}")
+            return None
+        
+        if response.status == 200:
+            return response.data
+        
+        if riot_key and response.status in (400, 404):
+            ttl = await asyncio.to_thread(self.ranking_store.record_failure, riot_key, response.status)
+            print(f"조회 불가 Riot ID: {riot_key} ({response.status}), {ttl / 3600:.0f}시간 후 재확인")
+            return None
+        
+        print(f"API 오류: {response.status}")
+        return None
+
+    def pick_account_key(self) -> str:
+        """새 계정을 조회할 키 (이 키가 발급한 PUUID로 이후 요청을 보낸다)"""
+        return self.key_pool.pick(ACCOUNT_HOST, 'account-v1.by-riot-id')
+
+    async def get_riot_puuid(self, game_name: str, tag_line: str, key_id: str) -> str:
+        """Rate Limited PUUID 조회"""
+        if key_id not in self.key_pool:
+            return None
+            
+        path = f"/riot/account/v1/accounts/by-riot-id/{quote(game_name, safe='')}/{quote(tag_line, safe='')}"
+        
+        result = await self.make_api_request(
+            ACCOUNT_HOST, 'account-v1.by-riot-id', path, riot_key=riot_id_key(game_name, tag_line), key_id=key_id
+        )
+        return result.get('puuid') if result else None
+
+    async def get_summoner_by_puuid(self, puuid: str, key_id: str, riot_key: str = None) -> dict:
+        """Rate Limited 소환사 정보 조회"""
+        if not puuid:
+            return None
+            
+        path = f"/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        
+        return await self.make_api_request(PLATFORM_HOST, 'summoner-v4.by-puuid', path, riot_key=riot_key, key_id=key_id)
+
+    async def get_rank_info(self, summoner_id: str, key_id: str) -> dict:
+        """Rate Limited 랭크 정보 조회
+        
+        조회에 실패하면(5xx, 시간 초과, 재시도 후에도 429) None을 반환한다. 빈 dict는
+        응답이 실제로 빈 목록인 경우(언랭크)에만 반환하므로, 일시적인 오류로 기존
+        랭크를 지우지 않는다.
+        """
+        if not summoner_id:
+            return None
+            
+        path = f"/lol/league/v4/entries/by-summoner/{summoner_id}"
+        
+        result = await self.make_api_request(PLATFORM_HOST, 'league-v4.entries.by-summoner', path, key_id=key_id)
+        if result is None:
+            return None
+            
+        ranks = {}
+        for entry in result:
+            for queue_type, queue_id in QUEUE_IDS.items():
+                if entry.get('queueType') == queue_id:
+                    ranks[queue_type] = self.parse_league_entry(entry)
+        return ranks
+
+    @staticmethod
+    def parse_league_entry(entry: dict, tier: str = None) -> dict:
+        """league-v4 엔트리를 캐시 형식으로 변환 (최상위 리그 엔트리는 tier를 따로 받는다)"""
+        return {
+            'tier': entry.get('tier', tier or 'UNRANKED'),
+            'rank': entry.get('rank', ''),
+            'lp': entry.get('leaguePoints', 0),
+            'wins': entry.get('wins', 0),
+            'losses': entry.get('losses', 0)
+        }
+
+    async def get_apex_league(self, queue_type: str, tier: str, key_id: str = None) -> list:
+        """챌린저/그랜드마스터/마스터 리그 전체 엔트리 (요청 1회, ID는 key_id 기준으로 암호화됨)"""
+        endpoint = APEX_LEAGUE_ENDPOINTS[tier]
+        path = f"/lol/league/v4/{endpoint}/by-queue/{QUEUE_IDS[queue_type]}"
+        
+        result = await self.make_api_request(PLATFORM_HOST, f'league-v4.{endpoint}', path, key_id=key_id)
+        if not result:
+            return []
+        return [dict(entry, tier=tier) for entry in result.get('entries', [])]
+
+    async def fetch_rank_data(self, member_id: int, discord_name: str, lol_name: str, tag: str) -> dict:
+        """멤버 한 명의 랭크 데이터 조회 (캐시된 PUUID / 소환사 ID가 있으면 리그만 조회)"""
+        print(f"처리 중: {discord_name} ({lol_name}#{tag})")
+        
+        key = riot_id_key(lol_name, tag)
+        await asyncio.to_thread(self.ranking_store.link_member, member_id, key)
+        unresolvable, cached = await self.lookup_cached([key])
+        if key in unresolvable:
+            print(f"  조회 불가로 기록된 Riot ID: {lol_name}#{tag}")
+            return None
+        summoner = cached.get(key)
+        
+        if summoner:
+            key_id = summoner['key_id']
+        else:
+            key_id = self.pick_account_key()
+            puuid = await self.get_riot_puuid(lol_name, tag, key_id)
+            if not puuid:
+                print(f"  PUUID 조회 실패: {lol_name}#{tag}")
+                return None
+                
+            summoner = await self.get_summoner_by_puuid(puuid, key_id, riot_key=key)
+            if not summoner:
+                print(f"  소환사 정보 조회 실패: {lol_name}#{tag}")
+                return None
+            await asyncio.to_thread(self.ranking_store.save_account, key, lol_name, tag, puuid, summoner, key_id)
+            
+        ranks = await self.get_rank_info(summoner['id'], key_id)
+        if ranks is None:
+            print(f"  랭크 정보 조회 실패: {lol_name}#{tag}")
+            return None
+        
+        print(f"  완료: {lol_name}#{tag}")
+        return self.build_rank_data(member_id, discord_name, lol_name, tag, summoner, ranks)
+
+    async def lookup_cached(self, riot_keys) -> tuple:
+        """여러 Riot ID의 (조회 불가 키 집합, {키: 캐시된 소환사})를 저장소에서 한 번에 조회
+        
+        SQLite 조회는 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        """
+        riot_keys = list(riot_keys)
+        unresolvable, accounts = await asyncio.to_thread(self._load_cached, riot_keys)
+        cached = {}
+        for riot_key, account in accounts.items():
+            summoner = self.cached_summoner(account)
+            if summoner:
+                cached[riot_key] = summoner
+        return unresolvable, cached
+
+    def _load_cached(self, riot_keys: list) -> tuple:
+        return self.ranking_store.unresolvable_keys(riot_keys), self.ranking_store.get_accounts(riot_keys)
+
+    def cached_summoner(self, account: dict) -> dict:
+        """캐시된 계정을 소환사 조회 응답과 같은 형태로 변환
+        
+        ID를 발급한 키가 풀에 없으면(키 교체, key_id 없는 이전 데이터) 쓸 수 없으므로 None.
+        """
+        if not account or not account['summoner_id'] or account['key_id'] not in self.key_pool:
+            return None
+        return {
+            'id': account['summoner_id'],
+            'puuid': account['puuid'],
+            'summonerLevel': account['summoner_level'],
+            'key_id': account['key_id'],
+        }
+
+    @staticmethod
+    def build_rank_data(member_id: int, discord_name: str, lol_name: str, tag: str, summoner: dict, ranks: dict) -> dict:
+        """캐시에 저장할 랭크 데이터 구성"""
+        return {
+            'member_id': member_id,
+            'discord_name': discord_name,
+            'lol_name': lol_name,
+            'tag': tag,
+            'summoner_name': summoner.get('name', lol_name),
+            'level': summoner.get('summonerLevel', 0),
+            'ranks': ranks,
+            'updated_at': time.time()
+        }
+
+    async def run_pipeline(self, targets: list, concurrency: int = None,
+                           progress_callback=None, result_callback=None) -> list:
+        """계정 → 소환사 → 리그 3단계 파이프라인으로 멤버들을 동시에 처리
+        
+        같은 Riot ID(정규화된 키 기준)를 쓰는 멤버들은 하나의 작업으로 묶어 한 번만
+        조회하고, 결과를 각 멤버에게 나눠준다. 최대 concurrency개의 계정이 동시에
+        파이프라인에 올라가며, 각 단계는 독립된 워커들이 처리하므로 네트워크 지연
+        동안에도 Rate Limit 예산을 채울 수 있다. PUUID / 소환사 ID가 캐시된 계정은
+        리그 단계만 거친다. targets는 (멤버 ID, 표시 이름, 롤 닉네임, 태그) 목록이다.
+        progress_callback(완료 수, 전체 수)는 계정 하나가 끝날 때마다,
+        result_callback(랭크 데이터 목록)은 결과가 나올 때마다 호출된다.
+        """
+        concurrency = max(1, concurrency or self.concurrency)
+        
+        # 정규화된 Riot ID 키로 중복 제거
+        jobs = {}
+        links = []
+        for member_id, discord_name, lol_name, tag in targets:
+            if not lol_name or not tag:
+                continue
+            key = riot_id_key(lol_name, tag)
+            links.append((member_id, key))
+            job = jobs.get(key)
+            if job is None:
+                job = jobs[key] = {
+                    'riot_key': key,
+                    'lol_name': lol_name,
+                    'tag': tag,
+                    'members': [],
+                }
+            job['members'].append((member_id, discord_name))
+        
+        total = len(jobs)
+        results = []
+        if not total:
+            return results
+        if total < len(targets):
+            print(f"중복 Riot ID 정리: 멤버 {len(targets)}명 → 계정 {total}개")
+        
+        # 저장소 기록/조회는 계정마다 하지 않고 한 번에 스레드에서 처리
+        await asyncio.to_thread(self.ranking_store.link_members, links)
+        unresolvable, cached = await self.lookup_cached(jobs)
+        
+        account_queue = asyncio.Queue()
+        summoner_queue = asyncio.Queue()
+        league_queue = asyncio.Queue()
+        in_flight = asyncio.Semaphore(concurrency)
+        finished = asyncio.Event()
+        completed = 0
+        
+        def describe(job: dict) -> str:
+            return f"{job['lol_name']}#{job['tag']}"
+        
+        async def finish(job: dict, ranks: dict = None):
+            nonlocal completed
+            completed += 1
+            in_flight.release()
+            if ranks is not None:
+                # 같은 계정을 쓰는 모든 멤버에게 결과 분배
+                shared = [
+                    self.build_rank_data(member_id, discord_name, job['lol_name'], job['tag'], job['summoner'], ranks)
+                    for member_id, discord_name in job['members']
+                ]
+                results.extend(shared)
+                if result_callback:
+                    try:
+                        await result_callback(shared)
+                    except Exception as e:
+                        print(f"결과 콜백 오류: {e}")
+            if completed % 10 == 0 or completed == total:
+                print(f"[{completed}/{total}] 진행 중... (성공 {len(results)}명)")
+            if progress_callback:
+                try:
+                    await progress_callback(completed, total)
+                except Exception as e:
+                    print(f"진행 상황 콜백 오류: {e}")
+            if completed == total:
+                finished.set()
+        
+        async def account_stage():
+            while True:
+                job = await account_queue.get()
+                try:
+                    job['key_id'] = self.pick_account_key()
+                    job['puuid'] = await self.get_riot_puuid(job['lol_name'], job['tag'], job['key_id'])
+                    if job['puuid']:
+                        summoner_queue.put_nowait(job)
+                    else:
+                        print(f"  PUUID 조회 실패: {describe(job)}")
+                        await finish(job)
+                except Exception as e:
+                    print(f"오류 발생 ({describe(job)}): {e}")
+                    await finish(job)
+        
+        async def summoner_stage():
+            while True:
+                job = await summoner_queue.get()
+                try:
+                    job['summoner'] = await self.get_summoner_by_puuid(
+                        job['puuid'], job['key_id'], riot_key=job['riot_key']
+                    )
+                    if job['summoner']:
+                        await asyncio.to_thread(
+                            self.ranking_store.save_account, job['riot_key'], job['lol_name'], job['tag'],
+                            job['puuid'], job['summoner'], job['key_id']
+                        )
+                        league_queue.put_nowait(job)
+                    else:
+                        print(f"  소환사 정보 조회 실패: {describe(job)}")
+                        await finish(job)
+                except Exception as e:
+                    print(f"오류 발생 ({describe(job)}): {e}")
+                    await finish(job)
+        
+        async def league_stage():
+            while True:
+                job = await league_queue.get()
+                ranks = None
+                try:
+                    ranks = await self.get_rank_info(job['summoner']['id'], job['key_id'])
+                    if ranks is None:
+                        # 조회 실패는 결과 없이 끝내 기존 랭크 데이터를 덮어쓰지 않는다
+                        print(f"  랭크 정보 조회 실패: {describe(job)}")
+                except Exception as e:
+                    print(f"오류 발생 ({describe(job)}): {e}")
+                await finish(job, ranks)
+        
+        workers = []
+        for stage in (account_stage, summoner_stage, league_stage):
+            workers.extend(asyncio.create_task(stage()) for _ in range(concurrency))
+        
+        try:
+            for job in jobs.values():
+                await in_flight.acquire()
+                if job['riot_key'] in unresolvable:
+                    await finish(job)
+                    continue
+                
+                # 닉네임이 그대로면 캐시된 PUUID / 소환사 ID로 바로 리그 단계 진입
+                job['summoner'] = cached.get(job['riot_key'])
+                if job['summoner']:
+                    job['key_id'] = job['summoner']['key_id']
+                    league_queue.put_nowait(job)
+                else:
+                    account_queue.put_nowait(job)
+            await finished.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        return results
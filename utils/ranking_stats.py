@@ -0,0 +1,89 @@
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import compress
+from operator import eq
+from functools import partial
+
+
+class RankColumns:
+    """큐 하나의 랭크 데이터를 열(array) 단위로 보관하는 통계용 테이블
+
+    멤버마다 딕셔너리를 순회하지 않고, 열 전체에 대한 내장 함수(sum, sorted,
+    Counter, compress) 호출로 집계하므로 갱신 때마다 다시 계산해도 부담이 없다.
+    삭제는 마지막 행을 빈자리로 옮겨 O(1)로 처리한다.
+    """
+
+    def __init__(self):
+        self._slots = {}                 # member_id → 행 번호
+        self.member_ids = array('q')
+        self.tiers = array('b')          # 티어 우선순위 (IRON=0 ... CHALLENGER=9)
+        self.scores = array('l')         # calculate_rank_score 값
+        self.lps = array('l')
+        self.wins = array('l')
+        self.losses = array('l')
+        self._sorted_scores = None       # 백분위 계산용 (변경 시 무효화)
+
+    def __len__(self) -> int:
+        return len(self.member_ids)
+
+    def _columns(self) -> tuple:
+        return self.member_ids, self.tiers, self.scores, self.lps, self.wins, self.losses
+
+    def upsert(self, member_id: int, tier: int, score: int, lp: int, wins: int, losses: int):
+        """멤버 한 명의 행 추가 또는 갱신"""
+        row = (member_id, tier, score, lp, wins, losses)
+        index = self._slots.get(member_id)
+        if index is None:
+            self._slots[member_id] = len(self.member_ids)
+            for column, value in zip(self._columns(), row):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns(), row):
+                column[index] = value
+        self._sorted_scores = None
+
+    def remove(self, member_id: int):
+        """멤버 행 제거 (없으면 무시)"""
+        index = self._slots.pop(member_id, None)
+        if index is None:
+            return
+        last = len(self.member_ids) - 1
+        if index != last:
+            for column in self._columns():
+                column[index] = column[last]
+            self._slots[self.member_ids[index]] = index
+        for column in self._columns():
+            column.pop()
+        self._sorted_scores = None
+
+    def clear(self):
+        self._slots.clear()
+        for column in self._columns():
+            del column[:]
+        self._sorted_scores = None
+
+    def percentile(self, member_id: int) -> float:
+        """멤버가 상위 몇 %인지 (동점은 같은 값, 없으면 None)"""
+        index = self._slots.get(member_id)
+        if index is None:
+            return None
+        if self._sorted_scores is None:
+            self._sorted_scores = sorted(self.scores)
+        total = len(self._sorted_scores)
+        higher = total - bisect_right(self._sorted_scores, self.scores[index])
+        return (higher + 1) / total * 100
+
+    def tier_summary(self) -> dict:
+        """티어별 {'count', 'avg_lp', 'winrate'} (승률은 티어 전체 승/패 기준)"""
+        summary = {}
+        for tier, count in Counter(self.tiers).items():
+            mask = list(map(partial(eq, tier), self.tiers))
+            wins = sum(compress(self.wins, mask))
+            games = wins + sum(compress(self.losses, mask))
+            summary[tier] = {
+                'count': count,
+                'avg_lp': sum(compress(self.lps, mask)) / count,
+                'winrate': wins / games * 100 if games else 0.0,
+            }
+        return summary
@@ -0,0 +1,359 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+# 조회 불가 Riot ID 재확인 간격: 실패할 때마다 두 배, 최대 7일
+NEGATIVE_CACHE_BASE_TTL = 6 * 3600
+NEGATIVE_CACHE_MAX_TTL = 7 * 86400
+
+# 스냅샷 저장 형식 버전 (형식이 바뀌면 올리고, 다른 버전은 읽지 않는다)
+SNAPSHOT_FORMAT = 2
+
+# 랭크 기록의 큐 타입은 정수로 저장한다
+HISTORY_QUEUES = {'solo': 0, 'flex': 1}
+
+
+class RankingStore:
+    """랭킹 관련 데이터를 보관하는 SQLite 저장소
+
+    - riot_accounts: Riot ID → PUUID / 소환사 ID 캐시 (ID를 발급한 API 키의 key_id 포함)
+    - member_accounts: 디스코드 멤버가 마지막으로 사용한 Riot ID
+    - riot_id_failures: 존재하지 않는 Riot ID (네거티브 캐시, 재확인 시각 포함)
+    - ranking_snapshots: 수집 결과 스냅샷 (재시작 후에도 바로 발행 가능)
+    - leaderboard_messages: (채널, 큐)별 순위표 메시지 ID와 마지막 내용 해시
+    - rank_history: 멤버/큐별 랭크 변화 기록 (값이 바뀐 시점만 저장)
+    - collection_checkpoint: 진행 중인 전체 수집의 시작 시각과 완료한 멤버 (중단 후 이어서 수집)
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(DATA_DIR, 'ranking.db')
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS riot_accounts (
+                    riot_key TEXT PRIMARY KEY,
+                    game_name TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    puuid TEXT NOT NULL,
+                    summoner_id TEXT,
+                    summoner_level INTEGER DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    key_id TEXT
+                );
+                CREATE TABLE IF NOT EXISTS member_accounts (
+                    member_id INTEGER PRIMARY KEY,
+                    riot_key TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS riot_id_failures (
+                    riot_key TEXT PRIMARY KEY,
+                    failures INTEGER NOT NULL,
+                    last_status INTEGER,
+                    retry_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS ranking_snapshots (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    format INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    player_count INTEGER NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS leaderboard_messages (
+                    channel_id INTEGER NOT NULL,
+                    queue_type TEXT NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    PRIMARY KEY (channel_id, queue_type)
+                );
+                -- (멤버, 큐, 시각) 순으로 클러스터링되어 구간 조회가 인덱스 탐색 한 번으로 끝난다
+                CREATE TABLE IF NOT EXISTS rank_history (
+                    member_id INTEGER NOT NULL,
+                    queue INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    score INTEGER NOT NULL,
+                    wins INTEGER NOT NULL,
+                    losses INTEGER NOT NULL,
+                    PRIMARY KEY (member_id, queue, ts)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS collection_checkpoint (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    started_at REAL NOT NULL,
+                    done_members TEXT NOT NULL
+                );
+            """)
+            # key_id 이전에 만든 DB: 기존 행은 key_id가 없으므로 다음 조회 때 다시 확인된다
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(riot_accounts)")}
+            if 'key_id' not in columns:
+                self._conn.execute("ALTER TABLE riot_accounts ADD COLUMN key_id TEXT")
+            # 채널 ID만 기본 키였던 DB: 한 채널에 두 큐를 게시해도 서로 덮어쓰지 않도록 키를 넓힌다
+            primary_key = {row['name'] for row in self._conn.execute("PRAGMA table_info(leaderboard_messages)")
+                           if row['pk']}
+            if primary_key == {'channel_id'}:
+                self._conn.executescript("""
+                    ALTER TABLE leaderboard_messages RENAME TO leaderboard_messages_old;
+                    CREATE TABLE leaderboard_messages (
+                        channel_id INTEGER NOT NULL,
+                        queue_type TEXT NOT NULL,
+                        message_id INTEGER NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        PRIMARY KEY (channel_id, queue_type)
+                    );
+                    INSERT INTO leaderboard_messages SELECT channel_id, queue_type, message_id, content_hash
+                        FROM leaderboard_messages_old;
+                    DROP TABLE leaderboard_messages_old;
+                """)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ----------------- Riot ID 캐시 -----------------
+    def get_accounts(self, riot_keys) -> dict:
+        """여러 Riot ID의 캐시된 계정 정보를 한 번에 조회 ({Riot ID 키: 계정 정보})"""
+        accounts = {}
+        with self._lock:
+            for chunk in _chunks(list(riot_keys)):
+                rows = self._conn.execute(
+                    f"SELECT * FROM riot_accounts WHERE riot_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                accounts.update((row['riot_key'], dict(row)) for row in rows)
+        return accounts
+
+    def save_account(self, riot_key: str, game_name: str, tag: str, puuid: str, summoner: dict = None,
+                     key_id: str = None):
+        """조회에 성공한 계정 정보 저장 (key_id는 PUUID / 소환사 ID를 발급한 API 키)"""
+        summoner = summoner or {}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO riot_accounts "
+                "(riot_key, game_name, tag, puuid, summoner_id, summoner_level, updated_at, key_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (riot_key, game_name, tag, puuid, summoner.get('id'),
+                 summoner.get('summonerLevel', 0), time.time(), key_id)
+            )
+            self._conn.execute("DELETE FROM riot_id_failures WHERE riot_key = ?", (riot_key,))
+
+    # ----------------- 조회 불가 Riot ID (네거티브 캐시) -----------------
+    def unresolvable_keys(self, riot_keys) -> set:
+        """주어진 Riot ID 중 아직 재확인 시각이 되지 않은 것들"""
+        now = time.time()
+        keys = set()
+        with self._lock:
+            for chunk in _chunks(list(riot_keys)):
+                rows = self._conn.execute(
+                    f"SELECT riot_key FROM riot_id_failures WHERE riot_key IN ({','.join('?' * len(chunk))}) "
+                    "AND retry_at > ?", (*chunk, now)
+                ).fetchall()
+                keys.update(row['riot_key'] for row in rows)
+        return keys
+
+    def record_failure(self, riot_key: str, status: int) -> float:
+        """조회 실패 기록 후 다음 재확인까지의 시간(초)을 반환"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT failures FROM riot_id_failures WHERE riot_key = ?", (riot_key,)
+            ).fetchone()
+            failures = (row['failures'] if row else 0) + 1
+            ttl = min(NEGATIVE_CACHE_BASE_TTL * 2 ** (failures - 1), NEGATIVE_CACHE_MAX_TTL)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO riot_id_failures (riot_key, failures, last_status, retry_at) "
+                "VALUES (?, ?, ?, ?)",
+                (riot_key, failures, status, time.time() + ttl)
+            )
+        return ttl
+
+    # ----------------- 멤버 ↔ Riot ID 연결 -----------------
+    def link_member(self, member_id: int, riot_key: str) -> bool:
+        """멤버의 현재 Riot ID를 기록하고, 닉네임이 바뀌었으면 이전 캐시를 무효화
+
+        다른 멤버가 아직 이전 Riot ID를 쓰고 있으면 캐시는 유지한다.
+        닉네임이 바뀌었으면 True를 반환한다.
+        """
+        with self._lock, self._conn:
+            return self._link(member_id, riot_key)
+
+    def link_members(self, links) -> int:
+        """(멤버 ID, Riot ID 키) 목록을 한 트랜잭션으로 기록 (닉네임이 바뀐 멤버 수 반환)"""
+        with self._lock, self._conn:
+            return sum(self._link(member_id, riot_key) for member_id, riot_key in links)
+
+    def _link(self, member_id: int, riot_key: str) -> bool:
+        row = self._conn.execute(
+            "SELECT riot_key FROM member_accounts WHERE member_id = ?", (member_id,)
+        ).fetchone()
+        previous = row['riot_key'] if row else None
+        if previous == riot_key:
+            return False
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO member_accounts (member_id, riot_key) VALUES (?, ?)",
+            (member_id, riot_key)
+        )
+        # 닉네임을 고쳤으면 새 Riot ID는 실패 이력과 상관없이 바로 다시 확인
+        self._conn.execute("DELETE FROM riot_id_failures WHERE riot_key = ?", (riot_key,))
+        if previous:
+            in_use = self._conn.execute(
+                "SELECT 1 FROM member_accounts WHERE riot_key = ? LIMIT 1", (previous,)
+            ).fetchone()
+            if not in_use:
+                self._conn.execute("DELETE FROM riot_accounts WHERE riot_key = ?", (previous,))
+        return previous is not None
+
+    # ----------------- 랭킹 스냅샷 -----------------
+    def save_snapshot(self, ranking_data: list, keep: int = 7) -> int:
+        """수집 결과를 새 버전의 스냅샷으로 저장하고 오래된 스냅샷은 정리"""
+        payload = json.dumps(ranking_data, ensure_ascii=False, separators=(',', ':'))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO ranking_snapshots (format, created_at, player_count, payload) "
+                "VALUES (?, ?, ?, ?)",
+                (SNAPSHOT_FORMAT, time.time(), len(ranking_data), payload)
+            )
+            version = cursor.lastrowid
+            self._conn.execute(
+                "DELETE FROM ranking_snapshots WHERE version <= ?", (version - keep,)
+            )
+        return version
+
+    def load_latest_snapshot(self) -> tuple:
+        """가장 최근 스냅샷을 (버전, 생성 시각, 랭킹 데이터)로 반환 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created_at, payload FROM ranking_snapshots "
+                "WHERE format = ? ORDER BY version DESC LIMIT 1",
+                (SNAPSHOT_FORMAT,)
+            ).fetchone()
+        if not row:
+            return None
+        return row['version'], row['created_at'], json.loads(row['payload'])
+
+    # ----------------- 순위표 메시지 -----------------
+    def get_leaderboard_messages(self, channel_id: int) -> dict:
+        """채널에 게시된 순위표 메시지 정보 ({큐 타입: 메시지 정보})"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM leaderboard_messages WHERE channel_id = ?", (channel_id,)
+            ).fetchall()
+        return {row['queue_type']: dict(row) for row in rows}
+
+    def save_leaderboard_message(self, channel_id: int, queue_type: str, message_id: int, content_hash: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leaderboard_messages "
+                "(channel_id, queue_type, message_id, content_hash) VALUES (?, ?, ?, ?)",
+                (channel_id, queue_type, message_id, content_hash)
+            )
+
+    # ----------------- 전체 수집 체크포인트 -----------------
+    def save_collection_checkpoint(self, started_at: float, done_members):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collection_checkpoint (id, started_at, done_members) VALUES (1, ?, ?)",
+                (started_at, json.dumps(sorted(done_members)))
+            )
+
+    def load_collection_checkpoint(self) -> tuple:
+        """중단된 수집을 (시작 시각, 완료한 멤버 ID 집합)으로 반환 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT started_at, done_members FROM collection_checkpoint WHERE id = 1"
+            ).fetchone()
+        if not row:
+            return None
+        return row['started_at'], set(json.loads(row['done_members']))
+
+    def clear_collection_checkpoint(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM collection_checkpoint")
+
+    # ----------------- 랭크 기록 -----------------
+    def append_history(self, points: list) -> int:
+        """(멤버 ID, 큐 타입, 시각, 점수, 승, 패) 목록 추가
+        
+        직전 기록과 점수/승/패가 모두 같으면 저장하지 않는다. 저장한 개수를 반환한다.
+        """
+        added = 0
+        with self._lock, self._conn:
+            for member_id, queue_type, ts, score, wins, losses in points:
+                queue = HISTORY_QUEUES[queue_type]
+                last = self._conn.execute(
+                    "SELECT ts, score, wins, losses FROM rank_history "
+                    "WHERE member_id = ? AND queue = ? ORDER BY ts DESC LIMIT 1",
+                    (member_id, queue)
+                ).fetchone()
+                if last and (last['ts'] >= int(ts) or
+                             (last['score'], last['wins'], last['losses']) == (score, wins, losses)):
+                    continue
+                self._conn.execute(
+                    "INSERT INTO rank_history (member_id, queue, ts, score, wins, losses) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (member_id, queue, int(ts), score, wins, losses)
+                )
+                added += 1
+        return added
+
+    def get_history_deltas(self, queue_type: str, member_ids: list, since: float) -> dict:
+        """since 시점 대비 멤버별 (점수 변화, 승 변화, 패 변화)
+        
+        기준값은 since 이전의 마지막 기록이며, 그 뒤에 처음 기록된 멤버는 첫 기록을 기준으로 한다.
+        멤버마다 기본 키 탐색만 하므로 기록이 쌓여도 조회 비용은 멤버 수에 비례한다.
+        """
+        queue = HISTORY_QUEUES[queue_type]
+        since = int(since)
+        deltas = {}
+        with self._lock:
+            for member_id in member_ids:
+                latest = self._conn.execute(
+                    "SELECT ts, score, wins, losses FROM rank_history "
+                    "WHERE member_id = ? AND queue = ? ORDER BY ts DESC LIMIT 1",
+                    (member_id, queue)
+                ).fetchone()
+                if not latest:
+                    continue
+                base = self._conn.execute(
+                    "SELECT ts, score, wins, losses FROM rank_history "
+                    "WHERE member_id = ? AND queue = ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
+                    (member_id, queue, since)
+                ).fetchone() or self._conn.execute(
+                    "SELECT ts, score, wins, losses FROM rank_history "
+                    "WHERE member_id = ? AND queue = ? AND ts > ? ORDER BY ts LIMIT 1",
+                    (member_id, queue, since)
+                ).fetchone()
+                if base['ts'] == latest['ts']:
+                    continue
+                deltas[member_id] = (latest['score'] - base['score'],
+                                     latest['wins'] - base['wins'],
+                                     latest['losses'] - base['losses'])
+        return deltas
+
+    def downsample_history(self, older_than: float) -> int:
+        """older_than 이전 기록은 멤버/큐/날짜(UTC)별 마지막 값만 남기고 삭제"""
+        cutoff = int(older_than)
+        with self._lock, self._conn:
+            # 같은 날 더 늦은 기록이 있는 행만 삭제 (행마다 기본 키 구간 탐색 한 번)
+            cursor = self._conn.execute(
+                "DELETE FROM rank_history AS h WHERE h.ts < ? AND EXISTS ("
+                "    SELECT 1 FROM rank_history AS later "
+                "    WHERE later.member_id = h.member_id AND later.queue = h.queue "
+                "    AND later.ts > h.ts AND later.ts < MIN(?, (h.ts / 86400 + 1) * 86400)"
+                ")",
+                (cutoff, cutoff)
+            )
+        return cursor.rowcount
+
+
+def _chunks(items: list, size: int = 500):
+    """SQLite 변수 개수 제한에 걸리지 않도록 IN 조건을 나눠서 조회"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import multiprocessing
+import queue
+
+from utils.ranking_collector import RankingCollector
+from utils.ranking_store import RankingStore
+from utils.riot_api import RiotKeyPool
+
+
+class WorkerUnavailable(Exception):
+    """워커 프로세스가 종료되었거나 응답하지 않을 때"""
+
+
+def worker_main(config: dict, requests, results):
+    """워커 프로세스 진입점: 봇과 분리된 이벤트 루프에서 수집 요청을 처리"""
+    try:
+        asyncio.run(_serve(config, requests, results))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.put(('closed', None, None))
+
+
+async def _serve(config: dict, requests, results):
+    key_pool = RiotKeyPool(config['api_keys'], config['app_rate_limit'], timeout=10)
+    ranking_store = RankingStore(config.get('store_path'))
+    collector = RankingCollector(key_pool, ranking_store, config['concurrency'])
+    running = {}                         # 작업 ID → Task
+
+    async def collect(job_id: int, targets: list):
+        async def on_progress(completed: int, total: int):
+            results.put(('progress', job_id, (completed, total)))
+
+        async def on_results(rank_data: list):
+            results.put(('results', job_id, rank_data))
+
+        try:
+            collected = await collector.run_pipeline(
+                targets, progress_callback=on_progress, result_callback=on_results
+            )
+            results.put(('done', job_id, len(collected)))
+        except asyncio.CancelledError:
+            results.put(('error', job_id, '취소됨'))
+        except Exception as e:
+            results.put(('error', job_id, str(e)))
+        finally:
+            running.pop(job_id, None)
+
+    print(f"랭킹 수집 워커 시작 (API 키 {len(key_pool)}개, 동시 처리 {config['concurrency']}개)")
+    try:
+        while True:
+            message = await asyncio.to_thread(requests.get)
+            if message is None:
+                break
+            kind, job_id, targets = message
+            if kind == 'collect':
+                running[job_id] = asyncio.create_task(collect(job_id, targets))
+            elif kind == 'cancel' and job_id in running:
+                running[job_id].cancel()
+        if running:
+            await asyncio.gather(*running.values(), return_exceptions=True)
+    finally:
+        await key_pool.close()
+        ranking_store.close()
+
+
+class RankingWorker:
+    """랭킹 수집을 별도 프로세스에서 실행하고 결과를 스트리밍으로 받아오는 핸들
+
+    워커는 키별 Rate Limiter와 SQLite 연결(WAL)을 따로 가지며, 봇 프로세스의 Rate
+    Limiter와는 Riot 응답의 -Count 헤더로 사용량이 맞춰진다.
+    """
+
+    def __init__(self, api_keys: list, app_rate_limit: str, concurrency: int, store_path: str = None):
+        self.config = {
+            'api_keys': api_keys,
+            'app_rate_limit': app_rate_limit,
+            'concurrency': concurrency,
+            'store_path': store_path,
+        }
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._requests = None
+        self._results = None
+        self._reader = None
+        self._jobs = {}                  # 작업 ID → 메시지를 전달할 asyncio.Queue
+        self._job_ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """워커 프로세스와 결과 수신 태스크 시작 (이미 실행 중이면 무시)"""
+        if self.alive:
+            return
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._process = self._context.Process(
+            target=worker_main, args=(self.config, self._requests, self._results),
+            name='ranking-worker', daemon=True
+        )
+        self._process.start()
+        self._reader = asyncio.create_task(self._read_results())
+
+    async def _read_results(self):
+        """워커가 보낸 메시지를 작업별 큐로 분배"""
+        results = self._results
+        while True:
+            try:
+                kind, job_id, payload = await asyncio.to_thread(results.get, True, 1.0)
+            except queue.Empty:
+                if self.alive:
+                    continue
+                kind, job_id, payload = 'closed', None, None
+            if kind == 'closed':
+                break
+            inbox = self._jobs.get(job_id)
+            if inbox:
+                inbox.put_nowait((kind, payload))
+        # 남은 작업은 실패로 끝낸다
+        for inbox in self._jobs.values():
+            inbox.put_nowait(('error', '워커 프로세스가 종료되었습니다.'))
+
+    async def collect(self, targets: list, progress_callback=None, result_callback=None) -> list:
+        """워커에서 수집을 실행하고, 결과가 도착하는 대로 result_callback에 전달
+
+        targets는 RankingCollector.run_pipeline과 같은 형식이며 전체 결과 목록을 반환한다.
+        """
+        if not self.alive:
+            raise WorkerUnavailable("랭킹 수집 워커가 실행 중이 아닙니다.")
+
+        job_id = next(self._job_ids)
+        inbox = self._jobs[job_id] = asyncio.Queue()
+        collected = []
+        try:
+            self._requests.put(('collect', job_id, targets))
+            while True:
+                kind, payload = await inbox.get()
+                if kind == 'results':
+                    collected.extend(payload)
+                    if result_callback:
+                        await result_callback(payload)
+                elif kind == 'progress':
+                    if progress_callback:
+                        await progress_callback(*payload)
+                elif kind == 'done':
+                    return collected
+                else:
+                    raise WorkerUnavailable(payload)
+        except asyncio.CancelledError:
+            # 봇 쪽에서 취소되면 워커의 작업도 멈춘다
+            if self.alive:
+                self._requests.put(('cancel', job_id, None))
+            raise
+        finally:
+            del self._jobs[job_id]
+
+    async def stop(self, timeout: float = 10):
+        """진행 중인 작업을 마무리하도록 알리고 프로세스 종료"""
+        if self._process is None:
+            return
+        if self.alive:
+            self._requests.put(None)
+            await asyncio.to_thread(self._process.join, timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                await asyncio.to_thread(self._process.join, 1)
+        if self._reader:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        self._process = None
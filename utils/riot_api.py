@@ -0,0 +1,333 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+# Riot 라우팅 호스트
+ACCOUNT_HOST = "asia.api.riotgames.com"   # account-v1 (지역 라우팅)
+PLATFORM_HOST = "kr.api.riotgames.com"    # summoner-v4, league-v4 (플랫폼 라우팅)
+
+# 헤더를 받기 전까지 사용할 개발용 키 기본 앱 제한
+DEFAULT_APP_RATE_LIMIT = "20:1,100:120"
+
+
+class RiotResponse(NamedTuple):
+    status: int
+    headers: dict
+    data: Optional[object]
+
+
+def parse_rate_limit_header(value: str) -> dict:
+    """'20:1,100:120' 형식의 헤더를 {윈도우(초): 값} 딕셔너리로 변환"""
+    windows = {}
+    if not value:
+        return windows
+    for part in value.split(','):
+        try:
+            count, seconds = part.strip().split(':')
+            windows[int(seconds)] = int(count)
+        except ValueError:
+            continue
+    return windows
+
+
+class RateLimitWindow:
+    """하나의 'N회 / T초' 슬라이딩 윈도우"""
+
+    def __init__(self, limit: int, seconds: int):
+        self.limit = limit
+        self.seconds = seconds
+        self.timestamps = deque()
+
+    def _expire(self, now: float):
+        while self.timestamps and self.timestamps[0] <= now - self.seconds:
+            self.timestamps.popleft()
+
+    def delay(self, now: float, margin: int) -> float:
+        """다음 요청을 보내기 전 기다려야 하는 시간"""
+        self._expire(now)
+        allowed = max(1, self.limit - margin)
+        if len(self.timestamps) < allowed:
+            return 0.0
+        # 가장 오래된 요청들이 윈도우를 벗어날 때까지 대기
+        index = len(self.timestamps) - allowed
+        return self.timestamps[index] + self.seconds - now
+
+    def remaining(self, now: float, margin: int) -> int:
+        """지금 윈도우에 남은 요청 수"""
+        self._expire(now)
+        return max(1, self.limit - margin) - len(self.timestamps)
+
+    def sync_count(self, now: float, server_count: int):
+        """서버가 집계한 횟수가 더 많으면 로컬 기록을 보수적으로 맞춘다"""
+        self._expire(now)
+        missing = server_count - len(self.timestamps)
+        for _ in range(missing):
+            self.timestamps.append(now)
+
+
+class RateLimitBucket:
+    """여러 윈도우를 동시에 만족해야 하는 제한 단위 (앱 또는 메서드)"""
+
+    def __init__(self, limits: dict = None):
+        self.windows: dict[int, RateLimitWindow] = {}
+        self.blocked_until = 0.0
+        if limits:
+            self.update_limits(limits)
+
+    def update_limits(self, limits: dict):
+        for seconds, limit in limits.items():
+            window = self.windows.get(seconds)
+            if window is None:
+                self.windows[seconds] = RateLimitWindow(limit, seconds)
+            else:
+                window.limit = limit
+        for seconds in list(self.windows):
+            if seconds not in limits:
+                del self.windows[seconds]
+
+    def sync_counts(self, now: float, counts: dict):
+        for seconds, count in counts.items():
+            window = self.windows.get(seconds)
+            if window:
+                window.sync_count(now, count)
+
+    def delay(self, now: float, margin: int) -> float:
+        wait = self.blocked_until - now
+        for window in self.windows.values():
+            wait = max(wait, window.delay(now, margin))
+        return max(wait, 0.0)
+
+    def remaining(self, now: float, margin: int) -> float:
+        if not self.windows:
+            return float('inf')
+        return min(window.remaining(now, margin) for window in self.windows.values())
+
+    def record(self, now: float):
+        for window in self.windows.values():
+            window.timestamps.append(now)
+
+
+class RateLimiter:
+    """응답 헤더 기반의 호스트/메서드별 다중 윈도우 Rate Limiter
+
+    - 앱 제한: 호스트(라우팅 값)마다 하나의 버킷
+    - 메서드 제한: (호스트, 메서드)마다 하나의 버킷
+    X-App-Rate-Limit / X-Method-Rate-Limit 헤더로 한도를, -Count 헤더로
+    서버 측 사용량을 갱신하므로 재시작이나 다른 프로세스의 사용분도 반영된다.
+    """
+
+    def __init__(self, default_app_limit: str = DEFAULT_APP_RATE_LIMIT, margin: int = 1):
+        self.default_app_limits = parse_rate_limit_header(default_app_limit)
+        self.margin = margin
+        self.app_buckets: dict[str, RateLimitBucket] = {}
+        self.method_buckets: dict[tuple, RateLimitBucket] = {}
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def _buckets(self, host: str, method: str) -> tuple:
+        app_bucket = self.app_buckets.get(host)
+        if app_bucket is None:
+            app_bucket = self.app_buckets[host] = RateLimitBucket(self.default_app_limits)
+        method_bucket = self.method_buckets.get((host, method))
+        if method_bucket is None:
+            method_bucket = self.method_buckets[(host, method)] = RateLimitBucket()
+        return app_bucket, method_bucket
+
+    def sustained_rate(self, host: str) -> float:
+        """호스트 앱 제한이 장기적으로 허용하는 초당 요청 수"""
+        app_bucket = self.app_buckets.get(host) or RateLimitBucket(self.default_app_limits)
+        rates = [max(1, w.limit - self.margin) / w.seconds for w in app_bucket.windows.values()]
+        return min(rates) if rates else 1.0
+
+    def delay(self, host: str, method: str) -> float:
+        """지금 요청하면 기다려야 하는 시간 (0이면 즉시 가능)"""
+        now = self._now()
+        app_bucket, method_bucket = self._buckets(host, method)
+        return max(app_bucket.delay(now, self.margin), method_bucket.delay(now, self.margin))
+
+    def remaining(self, host: str, method: str) -> float:
+        """앱/메서드 제한 중 더 빡빡한 쪽의 남은 요청 수"""
+        now = self._now()
+        app_bucket, method_bucket = self._buckets(host, method)
+        return min(app_bucket.remaining(now, self.margin), method_bucket.remaining(now, self.margin))
+
+    async def acquire(self, host: str, method: str):
+        """두 버킷 모두 여유가 생길 때까지 대기 후 요청 1회를 기록"""
+        app_bucket, method_bucket = self._buckets(host, method)
+        while True:
+            now = self._now()
+            wait = max(app_bucket.delay(now, self.margin), method_bucket.delay(now, self.margin))
+            if wait <= 0:
+                app_bucket.record(now)
+                method_bucket.record(now)
+                return
+            if wait >= 5:
+                print(f"Rate limit 대기 ({host} {method}): {wait:.1f}초")
+            await asyncio.sleep(wait + 0.05)
+
+    def update_from_headers(self, host: str, method: str, headers: dict):
+        """응답 헤더로 한도와 현재 사용량 갱신"""
+        now = self._now()
+        app_bucket, method_bucket = self._buckets(host, method)
+
+        app_limits = parse_rate_limit_header(headers.get('X-App-Rate-Limit'))
+        if app_limits:
+            app_bucket.update_limits(app_limits)
+        app_bucket.sync_counts(now, parse_rate_limit_header(headers.get('X-App-Rate-Limit-Count')))
+
+        method_limits = parse_rate_limit_header(headers.get('X-Method-Rate-Limit'))
+        if method_limits:
+            method_bucket.update_limits(method_limits)
+        method_bucket.sync_counts(now, parse_rate_limit_header(headers.get('X-Method-Rate-Limit-Count')))
+
+    def penalize(self, host: str, method: str, retry_after: float, limit_type: str = None):
+        """429 응답 시 원인이 된 버킷을 Retry-After 동안 막는다"""
+        app_bucket, method_bucket = self._buckets(host, method)
+        until = self._now() + retry_after
+        if limit_type == 'method':
+            buckets = (method_bucket,)
+        elif limit_type == 'application':
+            buckets = (app_bucket,)
+        else:
+            # service 제한이나 알 수 없는 경우 해당 메서드만 잠시 쉰다
+            buckets = (method_bucket,)
+        for bucket in buckets:
+            bucket.blocked_until = max(bucket.blocked_until, until)
+
+
+class RiotHttpClient:
+    """호스트별 keep-alive 커넥션 풀을 유지하는 비동기 Riot API 클라이언트"""
+
+    def __init__(self, api_key: str, timeout: float = 10, pool_size: int = 20, keepalive: float = 60,
+                 rate_limiter: RateLimiter = None, max_retries: int = 3):
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=5)
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    def _get_session(self, host: str) -> aiohttp.ClientSession:
+        """호스트 전용 세션 반환 (이벤트 루프 안에서 지연 생성)"""
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(
+                base_url=f"https://{host}",
+                connector=connector,
+                timeout=self.timeout,
+                headers={"X-Riot-Token": self.api_key or ""},
+            )
+            self._sessions[host] = session
+        return session
+
+    async def get(self, host: str, path: str, params: dict = None) -> RiotResponse:
+        """GET 요청 후 상태 코드, 헤더, JSON 본문 반환"""
+        session = self._get_session(host)
+        async with session.get(path, params=params) as response:
+            data = None
+            if response.status == 200:
+                data = await response.json(content_type=None)
+            else:
+                # 커넥션 재사용을 위해 본문을 끝까지 읽어둔다
+                await response.read()
+            return RiotResponse(response.status, dict(response.headers), data)
+
+    async def request(self, host: str, method: str, path: str, params: dict = None) -> RiotResponse:
+        """Rate Limit을 지키며 요청하고, 429는 최대 max_retries회까지만 재시도
+
+        method는 메서드 제한 버킷을 구분하는 이름이다 (예: 'league-v4.entries.by-summoner').
+        """
+        response = None
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(host, method)
+            response = await self.get(host, path, params)
+            self.rate_limiter.update_from_headers(host, method, response.headers)
+
+            if response.status != 429:
+                return response
+
+            limit_type = response.headers.get('X-Rate-Limit-Type')
+            retry_after = response.headers.get('Retry-After')
+            # service 제한은 Retry-After 없이 오는 경우가 있어 지수 백오프 사용
+            wait = float(retry_after) if retry_after else float(2 ** attempt)
+            print(f"Rate limit 도달 ({limit_type or 'unknown'}, {method}), {wait:.0f}초 후 재시도 "
+                  f"[{attempt + 1}/{self.max_retries}]")
+            self.rate_limiter.penalize(host, method, wait, limit_type)
+        return response
+
+    async def close(self):
+        """모든 세션과 커넥션 풀 정리"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+        # SSL 커넥션이 완전히 닫힐 시간을 준다
+        if sessions:
+            await asyncio.sleep(0.25)
+
+
+def api_key_id(api_key: str) -> str:
+    """API 키를 노출하지 않고 구분하기 위한 짧은 식별자 (SHA-256 앞 12자리)"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+
+class RiotKeyPool:
+    """여러 API 키를 묶어 남은 예산이 가장 많은 키로 요청을 분배하는 풀
+
+    키마다 독립된 RiotHttpClient / RateLimiter를 가지므로 처리량은 키 개수에 비례한다.
+    PUUID / 소환사 ID는 발급한 키로만 해석되므로, 그 ID로 하는 요청은 반드시
+    같은 key_id로 보내야 한다 (RankingStore에 key_id를 함께 저장하는 이유).
+    """
+
+    def __init__(self, api_keys: list, app_rate_limit: str = DEFAULT_APP_RATE_LIMIT, **client_options):
+        self.clients: dict[str, RiotHttpClient] = {}
+        for api_key in api_keys:
+            key_id = api_key_id(api_key)
+            if key_id not in self.clients:
+                self.clients[key_id] = RiotHttpClient(
+                    api_key, rate_limiter=RateLimiter(app_rate_limit), **client_options
+                )
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __contains__(self, key_id: str) -> bool:
+        return key_id in self.clients
+
+    def pick(self, host: str, method: str) -> str:
+        """대기 시간이 가장 짧고, 같으면 남은 요청 수가 가장 많은 키 (키가 없으면 None)"""
+        if not self.clients:
+            return None
+        return min(
+            self.clients,
+            key=lambda key_id: (self.clients[key_id].rate_limiter.delay(host, method),
+                                -self.clients[key_id].rate_limiter.remaining(host, method))
+        )
+
+    async def request(self, host: str, method: str, path: str, params: dict = None,
+                      key_id: str = None) -> RiotResponse:
+        """key_id로 요청 (없으면 예산이 가장 많은 키를 고른다)"""
+        client = self.clients[key_id or self.pick(host, method)]
+        return await client.request(host, method, path, params)
+
+    def sustained_rate(self, host: str) -> float:
+        """모든 키를 합친 호스트의 장기 초당 요청 수"""
+        return sum(client.rate_limiter.sustained_rate(host) for client in self.clients.values())
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
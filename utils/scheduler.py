@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import math
+
+import discord
+
+# 타이머 휠 한 칸의 길이(초)와 칸 수 (한 바퀴 = 51.2초, 더 긴 예약은 바퀴 수로 센다)
+SCHEDULER_TICK = 0.1
+SCHEDULER_SLOTS = 512
+
+
+class DeferredAction:
+    """예약된 작업 하나 (cancel()로 취소)"""
+
+    __slots__ = ('scheduler', 'key', 'action', 'args', 'slot', 'rounds')
+
+    def __init__(self, scheduler, key, action, args, slot, rounds):
+        self.scheduler = scheduler
+        self.key = key
+        self.action = action
+        self.args = args
+        self.slot = slot
+        self.rounds = rounds
+
+    def cancel(self) -> bool:
+        return self.scheduler._remove(self)
+
+
+class DeferredScheduler:
+    """지연 작업을 타이머 휠 하나로 모아 처리하는 스케줄러
+
+    이벤트 핸들러가 asyncio.sleep으로 기다리는 대신 "5초 뒤 이 메시지 삭제" 같은
+    작업을 넣고 바로 반환한다. 예약은 칸(slot)에 들어가는 작은 객체 하나이며, 대기
+    중인 작업이 몇 개든 휠을 돌리는 Task는 하나뿐이고 예약이 없으면 멈춘다.
+    작업은 예약 시각 이후 한 칸(tick) 안에 실행된다.
+
+    key를 주면 같은 key의 이전 예약을 대체하므로 취소/디바운스를 key로 할 수 있다.
+    """
+
+    def __init__(self, tick: float = SCHEDULER_TICK, slots: int = SCHEDULER_SLOTS):
+        self.tick = tick
+        self._wheel = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._keys = {}                  # key → 예약
+        self._count = 0
+        self._driver = None
+        self._running = set()            # 실행 중인 작업 Task (GC 방지)
+        self._anonymous = itertools.count()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def schedule(self, delay: float, action, *args, key=None) -> DeferredAction:
+        """delay초 뒤 action(*args) 실행 예약 (action은 코루틴 함수)"""
+        if key is None:
+            key = ('anonymous', next(self._anonymous))
+        else:
+            self.cancel(key)
+
+        ticks = max(1, math.ceil(delay / self.tick))
+        if self._driver is not None:
+            # 이번 칸은 이미 일부 지났으므로 한 칸 더 기다려야 예약 시각보다 빨리 실행되지 않는다
+            ticks += 1
+        slots = len(self._wheel)
+        slot = (self._cursor + ticks) % slots
+        handle = DeferredAction(self, key, action, args, slot, (ticks - 1) // slots)
+        self._wheel[slot].add(handle)
+        self._keys[key] = handle
+        self._count += 1
+
+        if self._driver is None:
+            self._driver = asyncio.create_task(self._run())
+        return handle
+
+    def cancel(self, key) -> bool:
+        """key로 예약 취소 (취소했으면 True)"""
+        handle = self._keys.get(key)
+        return self._remove(handle) if handle else False
+
+    def _remove(self, handle: DeferredAction) -> bool:
+        bucket = self._wheel[handle.slot]
+        if handle not in bucket:
+            return False
+        bucket.discard(handle)
+        if self._keys.get(handle.key) is handle:
+            del self._keys[handle.key]
+        self._count -= 1
+        return True
+
+    def delete_later(self, target, delay: float, key=None) -> DeferredAction:
+        """메시지/스레드/채널을 delay초 뒤 삭제 (이미 삭제되었으면 무시)"""
+        return self.schedule(delay, _delete_quietly, target, key=key)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while self._count:
+                next_tick += self.tick
+                # 이벤트 루프가 밀렸으면 기다리지 않고 지난 칸을 따라잡는다
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._advance()
+        finally:
+            self._driver = None
+
+    def _advance(self):
+        self._cursor = (self._cursor + 1) % len(self._wheel)
+        bucket = self._wheel[self._cursor]
+        due = []
+        for handle in bucket:
+            if handle.rounds:
+                handle.rounds -= 1
+            else:
+                due.append(handle)
+        for handle in due:
+            self._remove(handle)
+            task = asyncio.create_task(self._invoke(handle))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    @staticmethod
+    async def _invoke(handle: DeferredAction):
+        try:
+            await handle.action(*handle.args)
+        except Exception as e:
+            print(f"예약 작업 실행 오류 ({getattr(handle.action, '__name__', handle.action)}): {e}")
+
+    def close(self):
+        """대기 중인 예약을 모두 버리고 휠 정지"""
+        for bucket in self._wheel:
+            bucket.clear()
+        self._keys.clear()
+        self._count = 0
+        if self._driver:
+            self._driver.cancel()
+
+
+async def _delete_quietly(target):
+    try:
+        await target.delete()
+    except discord.HTTPException:
+        pass
+
+
+def get_scheduler(bot) -> DeferredScheduler:
+    """봇 전체가 함께 쓰는 지연 작업 스케줄러 (처음 호출할 때 생성)"""
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is None:
+        scheduler = bot.scheduler = DeferredScheduler()
+    return scheduler